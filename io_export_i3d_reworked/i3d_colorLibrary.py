@@ -33,11 +33,16 @@ from __future__ import annotations
 
 import json
 import os
+import array
 import re
+import sys
 import zlib
 import time
 import shutil
 import hashlib
+import functools
+import mmap
+from concurrent.futures import ThreadPoolExecutor
 import tempfile
 import zipfile
 import urllib.request
@@ -45,15 +50,23 @@ import urllib.parse
 import urllib.error
 import ssl
 import xml.etree.ElementTree as ET
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Set
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Set
 
 import bpy
 import bpy.utils.previews
+from bpy.app.handlers import persistent
 from bpy_extras.io_utils import ExportHelper, ImportHelper
 
 from .helpers.pathHelper import getGamePath, resolveGiantsPath
 
+# Optional: BLAKE3 (SIMD) for decal-store dedupe hashing; falls back to hashlib.sha256.
+try:
+    from blake3 import blake3 as _blake3
+except Exception:
+    _blake3 = None
+
 
 def _cl_get_prefs(context):
     try:
@@ -63,6 +76,31 @@ def _cl_get_prefs(context):
 
 
 
+# Scene collection property per library source.
+_LIBRARY_COLLECTION_ATTRS: Dict[str, str] = {
+    'MY': "i3d_cl_my_colors",
+    'GIANTS': "i3d_cl_giants_colors",
+    'POPULAR': "i3d_cl_popular_colors",
+}
+
+
+def _library_item_at(scene, src: str, index: int):
+    """Item at `index` in the `src` library collection, or None when out of range."""
+    coll = getattr(scene, _LIBRARY_COLLECTION_ATTRS.get(src, "i3d_cl_popular_colors"))
+    return coll[index] if 0 <= index < len(coll) else None
+
+
+# (index, collection) for each library's current selection, fetched in one call.
+_GET_MY_SELECTION = attrgetter("i3d_cl_my_index", "i3d_cl_my_colors")
+_GET_GIANTS_SELECTION = attrgetter("i3d_cl_giants_index", "i3d_cl_giants_colors")
+_GET_POPULAR_SELECTION = attrgetter("i3d_cl_popular_index", "i3d_cl_popular_colors")
+_LIBRARY_SELECTION_GETTERS = {
+    'MY': _GET_MY_SELECTION,
+    'GIANTS': _GET_GIANTS_SELECTION,
+    'POPULAR': _GET_POPULAR_SELECTION,
+}
+
+
 # -----------------------------------------------------------------------------
 # Persistent storage for "My Color Library"
 # -----------------------------------------------------------------------------
@@ -100,12 +138,35 @@ def _cl_decal_previews_free():
         except Exception:
             pass
     _I3D_CL_DECAL_PREVIEWS = None
+    _DECAL_ICON_IDS.clear()
+    _DECAL_ICON_WARM_QUEUE.clear()
+
+
+# {decal_image_path as stored on the item: (resolved path, icon_id)}; only successful loads are kept.
+_DECAL_ICON_IDS: Dict[str, Tuple[str, int]] = {}
+_DECAL_ICON_WARM_QUEUE: List[str] = []
+_DECAL_ICON_WARM_PER_TICK = 4
 
 
 def _cl_decal_icon_id(filepath: str) -> int:
     """Return an icon_id for the given decal image path, or 0 if unavailable."""
     if not filepath:
         return 0
+    hit = _DECAL_ICON_IDS.get(filepath)
+    if hit is not None:
+        # The file may have been deleted since (e.g. Clear Unused Cached Decals).
+        if os.path.exists(hit[0]):
+            return hit[1]
+        del _DECAL_ICON_IDS[filepath]
+        return 0
+    fp, icon_id = _cl_decal_icon_load(filepath)
+    if icon_id:
+        _DECAL_ICON_IDS[filepath] = (fp, icon_id)
+    return icon_id
+
+
+def _cl_decal_icon_load(filepath: str) -> Tuple[str, int]:
+    """Resolve the path and load it into the preview collection (uncached); returns (resolved path, icon_id)."""
     try:
         fp = bpy.path.abspath(str(filepath))
     except Exception:
@@ -116,21 +177,45 @@ def _cl_decal_icon_id(filepath: str) -> int:
         pass
     try:
         if not os.path.exists(fp):
-            return 0
+            return fp, 0
     except Exception:
-        return 0
+        return fp, 0
 
     pcoll = _cl_decal_previews_get()
     if pcoll is None:
-        return 0
+        return fp, 0
 
     key = fp  # unique per absolute file path
     try:
         if key not in pcoll:
             pcoll.load(key, fp, 'IMAGE')
-        return int(pcoll[key].icon_id)
+        return fp, int(pcoll[key].icon_id)
     except Exception:
-        return 0
+        return fp, 0
+
+
+def _schedule_decal_icon_warmup(paths) -> None:
+    """Queue decal thumbnails to be loaded on idle timer ticks, so the first preview popup/list draw is instant."""
+    for fp in paths:
+        if fp and fp not in _DECAL_ICON_IDS and fp not in _DECAL_ICON_WARM_QUEUE:
+            _DECAL_ICON_WARM_QUEUE.append(fp)
+    if not _DECAL_ICON_WARM_QUEUE:
+        return
+    try:
+        if not bpy.app.timers.is_registered(_decal_icon_warmup_timer):
+            bpy.app.timers.register(_decal_icon_warmup_timer, first_interval=0.0)
+    except Exception:
+        pass
+
+
+def _decal_icon_warmup_timer():
+    """Timer callback: load a few queued decal thumbnails per tick."""
+    for _ in range(min(_DECAL_ICON_WARM_PER_TICK, len(_DECAL_ICON_WARM_QUEUE))):
+        try:
+            _cl_decal_icon_id(_DECAL_ICON_WARM_QUEUE.pop(0))
+        except Exception:
+            pass
+    return 0.0 if _DECAL_ICON_WARM_QUEUE else None
 
 
 def _preview_key_for_material(mat: bpy.types.Material) -> int:
@@ -260,10 +345,15 @@ def _make_unique_dest_path(dest_dir: Path, filename: str) -> Path:
 
 _DECAL_CACHE_INDEX_FILENAME = "decal_cache_index.json"
 
+# Reserved decal index entry (the rest of the index is {sha1: filename}):
+#   {"algo": <_content_digest algorithm>, "files": {filename: [digest, size, mtime_ns]}}
+# Lets the cleanup dedupe skip re-hashing files that did not change since the last pass.
+_DECAL_DIGEST_CACHE_KEY = "_content_digests"
+
 def _decal_cache_index_path() -> Path:
     return _decal_store_dir() / _DECAL_CACHE_INDEX_FILENAME
 
-def _load_decal_cache_index() -> Dict[str, str]:
+def _load_decal_cache_index() -> Dict[str, Any]:
     try:
         p = _decal_cache_index_path()
         if not p.exists():
@@ -274,7 +364,7 @@ def _load_decal_cache_index() -> Dict[str, str]:
     except Exception:
         return {}
 
-def _save_decal_cache_index(idx: Dict[str, str]) -> None:
+def _save_decal_cache_index(idx: Dict[str, Any]) -> None:
     try:
         p = _decal_cache_index_path()
         p.parent.mkdir(parents=True, exist_ok=True)
@@ -293,6 +383,67 @@ def _sha1_file(p: Path) -> str:
         return ""
 
 
+def _content_digest_algo() -> str:
+    return "blake3" if _blake3 is not None else "sha256"
+
+
+_CONTENT_DIGEST_MMAP_MIN = 2 * 1024 * 1024
+# Below this many files the readahead hints are not worth the extra open() calls.
+_DIGEST_PREFETCH_MIN_FILES = 32
+
+
+def _prefetch_for_digest(paths: List[Path]) -> None:
+    """Ask the kernel to start reading every file up front (POSIX only, best-effort).
+
+    The hashing threads then mostly find the data already in the page cache, so reads
+    across files overlap instead of being issued one file at a time.
+    """
+    if len(paths) < _DIGEST_PREFETCH_MIN_FILES or not hasattr(os, "posix_fadvise"):
+        return
+    for p in paths:
+        try:
+            fd = os.open(p, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _content_digest(p: Path, limit: Optional[int] = None) -> str:
+    """Digest of a file's contents (or its first `limit` bytes) for dedupe. Raises on read errors.
+
+    Unlike _sha1_file (whose digests are persisted as decal cache index keys), this is only
+    compared within one pass, so it uses the fastest available hash.
+    """
+    ctor = _blake3 or hashlib.sha256
+    with open(p, "rb") as f:
+        if limit is not None:
+            h = ctor()
+            h.update(f.read(limit))
+            return h.hexdigest()
+        h = ctor()
+        if os.fstat(f.fileno()).st_size > _CONTENT_DIGEST_MMAP_MIN:
+            # Hash straight from the page cache instead of copying chunks into bytes objects.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    try:
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    except OSError:
+                        pass
+                mv = memoryview(mm)
+                try:
+                    h.update(mv)
+                finally:
+                    mv.release()
+        else:
+            h.update(f.read())
+        return h.hexdigest()
+
+
 def _copy_decal_to_store(src: Path) -> str:
     """Copy src image to the persistent decal store and return the new absolute filepath.
 
@@ -523,6 +674,12 @@ def _norm_color(v: Any) -> List[float]:
         return [1.0, 1.0, 1.0]
 
 
+@functools.lru_cache(maxsize=1024)
+def _norm_rgb(rgb: tuple) -> Tuple[float, float, float]:
+    """Memoized _norm_color for an already tuple()'d color (bpy arrays are not hashable)."""
+    return tuple(_norm_color(rgb))
+
+
 def _giants_srgb_triplet_from_color(rgb: Any) -> Tuple[float, float, float]:
     """Return sRGB floats snapped to 8-bit/255 for stable GIANTS colorScale."""
     c = _norm_color(rgb)
@@ -554,23 +711,56 @@ def _srgb_label_text(rgb: Any) -> str:
 
 # Debounced autosave
 _SAVE_PENDING = False
-
-
-def _do_save() -> None:
-    global _SAVE_PENDING
+_SAVE_DEBOUNCE_S = 0.25
+# Upper bound on how long a steady stream of requests can postpone the write.
+_SAVE_MAX_DELAY_S = 2.0
+# Bumped per schedule_save(); the timer compares it to the value seen at its last tick.
+_SAVE_VERSION = 0
+_SAVE_SEEN_VERSION = 0
+_SAVE_FIRST_REQUEST = 0.0
+
+
+def _do_save() -> Optional[float]:
+    global _SAVE_PENDING, _SAVE_SEEN_VERSION
+    # More requests arrived during the wait: hold off for another quiet window (bounded).
+    if _SAVE_VERSION != _SAVE_SEEN_VERSION and (time.monotonic() - _SAVE_FIRST_REQUEST) < _SAVE_MAX_DELAY_S:
+        _SAVE_SEEN_VERSION = _SAVE_VERSION
+        return _SAVE_DEBOUNCE_S
     _SAVE_PENDING = False
     try:
         save_my_colors()
     except Exception:
         pass
+    return None
 
 
 def schedule_save() -> None:
-    global _SAVE_PENDING
-    if _SAVE_PENDING:
+    global _SAVE_PENDING, _SAVE_VERSION, _SAVE_SEEN_VERSION, _SAVE_FIRST_REQUEST
+    _SAVE_VERSION += 1
+    # A pending flag without a live timer must not block saves.
+    if _SAVE_PENDING and bpy.app.timers.is_registered(_do_save):
         return
     _SAVE_PENDING = True
-    bpy.app.timers.register(_do_save, first_interval=0.25)
+    _SAVE_SEEN_VERSION = _SAVE_VERSION
+    _SAVE_FIRST_REQUEST = time.monotonic()
+    bpy.app.timers.register(_do_save, first_interval=_SAVE_DEBOUNCE_S)
+
+
+def _flush_pending_save() -> None:
+    """Write a pending debounced save now (before the scene it belongs to goes away)."""
+    global _SAVE_PENDING
+    try:
+        if bpy.app.timers.is_registered(_do_save):
+            bpy.app.timers.unregister(_do_save)
+    except Exception:
+        pass
+    if not _SAVE_PENDING:
+        return
+    _SAVE_PENDING = False
+    try:
+        save_my_colors()
+    except Exception:
+        pass
 
 
 def _on_my_color_update(self, context):
@@ -902,21 +1092,34 @@ _MTPL_CACHE_LOWER_TO_NAME: Dict[str, str] = {}
 # Material Template Apply Overrides (used by Apply TEMP/PERM flows)
 # -----------------------------------------------------------------------------
 # NOTE: These are intentionally global so we can avoid signature churn in existing
-# Apply operators (Blender add-on stability).
-_MTPL_OVERRIDE_DETAIL_DIFFUSE_MODE: str = ""  # "", "SKIP", "ROUGHNESS", "ALBEDO", "ALBEDO_TINT", "DECAL"
-_MTPL_OVERRIDE_DECAL_IMAGE_PATH: str = ""
-_MTPL_OVERRIDE_DECAL_PERSIST: bool = False
-_MTPL_OVERRIDE_APPLY_ALPHA: Optional[bool] = None  # None = auto, True/False = force
-_MTPL_OVERRIDE_FORCED_TINT: Optional[Tuple[float, float, float]] = None
+# Apply operators (Blender add-on stability). The active set is one immutable snapshot,
+# normalized once by _mtpl_apply_overrides instead of on every material.
+class _MtplOverride(NamedTuple):
+    dd_mode: str = ""  # "", "SKIP", "ROUGHNESS", "ALBEDO", "ALBEDO_TINT", "DECAL" (upper-cased)
+    decal_path: str = ""  # stripped
+    decal_exists: bool = False  # checked once when the override is set, not per material
+    decal_persist: bool = False
+    apply_alpha: Optional[bool] = None  # None = auto, True/False = force
+    forced_tint: Optional[Tuple[float, float, float]] = None
+    isfile_cache: Optional[Dict[str, bool]] = None  # per apply batch; None = no caching
+
+
+_MTPL_NO_OVERRIDE = _MtplOverride()
+_MTPL_OVERRIDE: _MtplOverride = _MTPL_NO_OVERRIDE
+
+
+def _isfile_cached(path: str, cache: Optional[Dict[str, bool]]) -> bool:
+    """os.path.isfile, answered once per path for the lifetime of `cache` (an apply batch)."""
+    if cache is None:
+        return os.path.isfile(path)
+    v = cache.get(path)
+    if v is None:
+        v = cache[path] = os.path.isfile(path)
+    return v
 
 def _mtpl_clear_overrides() -> None:
-    global _MTPL_OVERRIDE_DETAIL_DIFFUSE_MODE, _MTPL_OVERRIDE_DECAL_IMAGE_PATH, _MTPL_OVERRIDE_DECAL_PERSIST
-    global _MTPL_OVERRIDE_APPLY_ALPHA, _MTPL_OVERRIDE_FORCED_TINT
-    _MTPL_OVERRIDE_DETAIL_DIFFUSE_MODE = ""
-    _MTPL_OVERRIDE_DECAL_IMAGE_PATH = ""
-    _MTPL_OVERRIDE_DECAL_PERSIST = False
-    _MTPL_OVERRIDE_APPLY_ALPHA = None
-    _MTPL_OVERRIDE_FORCED_TINT = None
+    global _MTPL_OVERRIDE
+    _MTPL_OVERRIDE = _MTPL_NO_OVERRIDE
 
 from contextlib import contextmanager
 
@@ -928,32 +1131,26 @@ def _mtpl_apply_overrides(*,
     apply_alpha: Optional[bool] = None,
     forced_tint: Optional[Tuple[float, float, float]] = None,
 ):
-    global _MTPL_OVERRIDE_DETAIL_DIFFUSE_MODE, _MTPL_OVERRIDE_DECAL_IMAGE_PATH, _MTPL_OVERRIDE_DECAL_PERSIST
-    global _MTPL_OVERRIDE_APPLY_ALPHA, _MTPL_OVERRIDE_FORCED_TINT
-    _prev = (
-        _MTPL_OVERRIDE_DETAIL_DIFFUSE_MODE,
-        _MTPL_OVERRIDE_DECAL_IMAGE_PATH,
-        _MTPL_OVERRIDE_DECAL_PERSIST,
-        _MTPL_OVERRIDE_APPLY_ALPHA,
-        _MTPL_OVERRIDE_FORCED_TINT,
-    )
-    try:
-        if detail_diffuse_mode is not None:
-            _MTPL_OVERRIDE_DETAIL_DIFFUSE_MODE = str(detail_diffuse_mode or "")
-        if decal_image_path is not None:
-            _MTPL_OVERRIDE_DECAL_IMAGE_PATH = str(decal_image_path or "")
-        _MTPL_OVERRIDE_DECAL_PERSIST = bool(decal_persist)
-        _MTPL_OVERRIDE_APPLY_ALPHA = apply_alpha
-        _MTPL_OVERRIDE_FORCED_TINT = forced_tint
+    global _MTPL_OVERRIDE
+    _prev = _MTPL_OVERRIDE
+    if _prev.isfile_cache is None:
+        # Outermost apply: index loaded images once so per-material loads are dict hits.
+        _seed_image_cache()
+    try:
+        dd_mode = _prev.dd_mode if detail_diffuse_mode is None else str(detail_diffuse_mode or "").upper().strip()
+        dp = _prev.decal_path if decal_image_path is None else str(decal_image_path or "").strip()
+        _MTPL_OVERRIDE = _MtplOverride(
+            dd_mode=dd_mode,
+            decal_path=dp,
+            decal_exists=bool(dp) and os.path.isfile(dp),
+            decal_persist=bool(decal_persist),
+            apply_alpha=apply_alpha,
+            forced_tint=forced_tint,
+            isfile_cache={},
+        )
         yield
     finally:
-        (
-            _MTPL_OVERRIDE_DETAIL_DIFFUSE_MODE,
-            _MTPL_OVERRIDE_DECAL_IMAGE_PATH,
-            _MTPL_OVERRIDE_DECAL_PERSIST,
-            _MTPL_OVERRIDE_APPLY_ALPHA,
-            _MTPL_OVERRIDE_FORCED_TINT,
-        ) = _prev
+        _MTPL_OVERRIDE = _prev
 
 
 _MTPL_LAST_ERROR: str = ""
@@ -986,6 +1183,23 @@ def _prefer_dds(filepath: str) -> str:
     return p
 
 
+def _xml_attr(attrib, key: str) -> str:
+    """Stripped attribute value ("" when missing/empty)."""
+    v = attrib.get(key)
+    return v.strip() if v else ""
+
+
+def _xml_attr_or_child(el, attrib, key: str) -> str:
+    """Attribute-style value, falling back to child-style <key>...</key> text."""
+    v = attrib.get(key)
+    if v:
+        v = v.strip()
+        if v:
+            return v
+    v = el.findtext(key)
+    return v.strip() if v else ""
+
+
 def ensure_material_templates_cache(*, force: bool = False) -> bool:
     """Parse and cache $data/shared/detailLibrary/materialTemplates.xml.
 
@@ -1007,6 +1221,7 @@ def ensure_material_templates_cache(*, force: bool = False) -> bool:
         _MTPL_CACHE_NAMES = []
         _MTPL_CACHE_BY_NAME = {}
         _MTPL_CACHE_LOWER_TO_NAME = {}
+        _mtpl_clear_derived_caches()
         return False
 
     if not os.path.isfile(xml_path):
@@ -1016,6 +1231,7 @@ def ensure_material_templates_cache(*, force: bool = False) -> bool:
         _MTPL_CACHE_NAMES = []
         _MTPL_CACHE_BY_NAME = {}
         _MTPL_CACHE_LOWER_TO_NAME = {}
+        _mtpl_clear_derived_caches()
         return False
 
     try:
@@ -1037,35 +1253,22 @@ def ensure_material_templates_cache(*, force: bool = False) -> bool:
         for el in root.iter():
             if (str(el.tag).split("}")[-1] != "template"):
                 continue
-            nm = (el.attrib.get("name") or "").strip()
+            a = el.attrib
+            nm = _xml_attr(a, "name")
             if not nm:
                 continue
 
             # Store useful detail map attributes for preview injection.
             # Support both attribute-style (<template detailDiffuse="..."/>) and child-style
             # (<template><detailDiffuse>...</detailDiffuse></template>).
-            detail_diffuse = (el.attrib.get("detailDiffuse") or "").strip()
-            detail_specular = (el.attrib.get("detailSpecular") or "").strip()
-            detail_normal = (el.attrib.get("detailNormal") or "").strip()
-            if not detail_diffuse:
-                detail_diffuse = (el.findtext("detailDiffuse") or "").strip()
-            if not detail_specular:
-                detail_specular = (el.findtext("detailSpecular") or "").strip()
-            if not detail_normal:
-                detail_normal = (el.findtext("detailNormal") or "").strip()
-
-            category = (el.attrib.get("category") or "").strip()
-            title = (el.attrib.get("title") or "").strip()
-            icon_filename = (el.attrib.get("iconFilename") or "").strip()
-            color_scale = (el.attrib.get("colorScale") or "").strip()
-            if not category:
-                category = (el.findtext("category") or "").strip()
-            if not title:
-                title = (el.findtext("title") or "").strip()
-            if not icon_filename:
-                icon_filename = (el.findtext("iconFilename") or "").strip()
-            if not color_scale:
-                color_scale = (el.findtext("colorScale") or "").strip()
+            detail_diffuse = _xml_attr_or_child(el, a, "detailDiffuse")
+            detail_specular = _xml_attr_or_child(el, a, "detailSpecular")
+            detail_normal = _xml_attr_or_child(el, a, "detailNormal")
+
+            category = _xml_attr_or_child(el, a, "category")
+            title = _xml_attr_or_child(el, a, "title")
+            icon_filename = _xml_attr_or_child(el, a, "iconFilename")
+            color_scale = _xml_attr_or_child(el, a, "colorScale")
 
             game_path = getGamePath()
             # Resolve $data paths if present.
@@ -1077,21 +1280,11 @@ def ensure_material_templates_cache(*, force: bool = False) -> bool:
                 detail_normal = _prefer_dds(resolveGiantsPath(detail_normal, game_path))
 
             
-            smoothness_scale = (el.attrib.get("smoothnessScale") or "").strip()
-            metalness_scale = (el.attrib.get("metalnessScale") or "").strip()
-            clearcoat_intensity = (el.attrib.get("clearCoatIntensity") or "").strip()
-            clearcoat_smoothness = (el.attrib.get("clearCoatSmoothness") or "").strip()
-            porosity = (el.attrib.get("porosity") or "").strip()
-            if not smoothness_scale:
-                smoothness_scale = (el.findtext("smoothnessScale") or "").strip()
-            if not metalness_scale:
-                metalness_scale = (el.findtext("metalnessScale") or "").strip()
-            if not clearcoat_intensity:
-                clearcoat_intensity = (el.findtext("clearCoatIntensity") or "").strip()
-            if not clearcoat_smoothness:
-                clearcoat_smoothness = (el.findtext("clearCoatSmoothness") or "").strip()
-            if not porosity:
-                porosity = (el.findtext("porosity") or "").strip()
+            smoothness_scale = _xml_attr_or_child(el, a, "smoothnessScale")
+            metalness_scale = _xml_attr_or_child(el, a, "metalnessScale")
+            clearcoat_intensity = _xml_attr_or_child(el, a, "clearCoatIntensity")
+            clearcoat_smoothness = _xml_attr_or_child(el, a, "clearCoatSmoothness")
+            porosity = _xml_attr_or_child(el, a, "porosity")
 
             by_name[nm] = {
                 "name": nm,
@@ -1118,6 +1311,7 @@ def ensure_material_templates_cache(*, force: bool = False) -> bool:
         _MTPL_CACHE_NAMES = names
         _MTPL_CACHE_BY_NAME = by_name
         _MTPL_CACHE_LOWER_TO_NAME = lower_map
+        _mtpl_clear_derived_caches()
         _MTPL_LAST_ERROR = ""
         return True
 
@@ -1128,9 +1322,18 @@ def ensure_material_templates_cache(*, force: bool = False) -> bool:
         _MTPL_CACHE_NAMES = []
         _MTPL_CACHE_BY_NAME = {}
         _MTPL_CACHE_LOWER_TO_NAME = {}
+        _mtpl_clear_derived_caches()
         return False
 
 
+@functools.lru_cache(maxsize=512)
+def _mtpl_canonical_lookup(s: str) -> str:
+    # Memoized against the current template maps; cleared whenever ensure_material_templates_cache replaces them.
+    if s in _MTPL_CACHE_BY_NAME:
+        return s
+    return _MTPL_CACHE_LOWER_TO_NAME.get(s.lower(), s)
+
+
 def _mtpl_canonical_name(name: str) -> str:
     if not name:
         return ""
@@ -1138,12 +1341,7 @@ def _mtpl_canonical_name(name: str) -> str:
     s = str(name).strip()
     if not s:
         return ""
-    if s in _MTPL_CACHE_BY_NAME:
-        return s
-    low = s.lower()
-    if low in _MTPL_CACHE_LOWER_TO_NAME:
-        return _MTPL_CACHE_LOWER_TO_NAME[low]
-    return s
+    return _mtpl_canonical_lookup(s)
 
 
 # -----------------------------------------------------------------------------
@@ -1179,6 +1377,17 @@ def _mtpl_colorscale_rgb(template_name: str) -> Optional[Tuple[float, float, flo
 def _mtpl_blocks_permanent(template_name: str) -> bool:
     """True if template cannot be applied as Permanent material.
 
+    Runs the template freshness check before the memoized lookup so a reloaded
+    materialTemplates.xml is never answered from stale entries.
+    """
+    ensure_material_templates_cache(force=False)
+    return _mtpl_blocks_permanent_lookup(str(template_name or ""))
+
+
+@functools.lru_cache(maxsize=256)
+def _mtpl_blocks_permanent_lookup(template_name: str) -> bool:
+    """Memoized body of _mtpl_blocks_permanent.
+
     Rule of thumb:
     - If it requires vehicleShader math (alpha, reflector, forced colorScale-based metals), block.
     - Decals are explicitly allowed (DTAP request).
@@ -1288,6 +1497,7 @@ def _enforce_forced_color_on_item(item) -> None:
 def _mtpl_is_decal(template_name: str) -> bool:
     return "decal" in (str(template_name or "").lower())
 
+@functools.lru_cache(maxsize=256)
 def _mtpl_is_glass(template_name: str) -> bool:
     return "glass" in (str(template_name or "").lower())
 
@@ -1341,6 +1551,13 @@ def _mtpl_detail_diffuse_is_clear(template_name: str) -> bool:
 
 def _mtpl_needs_detail_prompt(template_name: str) -> bool:
     """True if template likely needs detailDiffuse to look right (flat normal + non-clear diffuse)."""
+    ensure_material_templates_cache(force=False)
+    return _mtpl_needs_detail_prompt_lookup(str(template_name or ""))
+
+
+@functools.lru_cache(maxsize=256)
+def _mtpl_needs_detail_prompt_lookup(template_name: str) -> bool:
+    # Memoized against the current template maps; cleared whenever ensure_material_templates_cache replaces them.
     if not template_name:
         return False
     s = str(template_name).lower()
@@ -1364,6 +1581,13 @@ def _mtpl_needs_detail_prompt(template_name: str) -> bool:
 
 
 
+def _mtpl_clear_derived_caches() -> None:
+    """Drop memoized lookups that depend on the loaded materialTemplates.xml."""
+    _mtpl_canonical_lookup.cache_clear()
+    _mtpl_blocks_permanent_lookup.cache_clear()
+    _mtpl_needs_detail_prompt_lookup.cache_clear()
+
+
 # Enum id mapping (Blender enum values must be <= 63 chars).
 _MT_VALUE_TO_ENUM_ID: Dict[str, str] = {}
 _MT_ENUM_ID_TO_VALUE: Dict[str, str] = {}
@@ -1609,14 +1833,35 @@ def load_my_colors_from_path(
     replace: bool,
     ignore_duplicate_color_material: bool = False,
 ) -> int:
+    ok, data = _read_my_colors_json(path)
+    if not ok or data is None:
+        return 0
+    return _load_my_colors_data(
+        path,
+        data,
+        replace=replace,
+        ignore_duplicate_color_material=ignore_duplicate_color_material,
+    )
+
+
+def _read_my_colors_json(path: Path) -> Tuple[bool, Any]:
+    """(ok, rows): (True, None) when the file is missing, (False, None) when it can't be read/parsed."""
     try:
         if not path.exists():
-            return 0
+            return True, None
         raw = path.read_text(encoding="utf-8")
-        data = json.loads(raw) if raw.strip() else []
+        return True, (json.loads(raw) if raw.strip() else [])
     except Exception:
-        return 0
+        return False, None
 
+
+def _load_my_colors_data(
+    path: Path,
+    data: Any,
+    *,
+    replace: bool,
+    ignore_duplicate_color_material: bool = False,
+) -> int:
     # If decal_image_path values are relative (e.g. "decals/foo.png"), try to resolve them
     # relative to the JSON file's folder. Optionally copy found images into the persistent
     # decal store so the library keeps working even if the import folder is moved/deleted.
@@ -1638,12 +1883,14 @@ def load_my_colors_from_path(
     scene = bpy.context.scene
     if not scene:
         return 0
-    return _apply_my(
+    added = _apply_my(
         scene,
         data,
         replace=replace,
         ignore_duplicate_color_material=ignore_duplicate_color_material,
     )
+    _schedule_decal_icon_warmup(getattr(it, "decal_image_path", "") for it in scene.i3d_cl_my_colors)
+    return added
 
 
 def save_my_colors_to_path(path: Path) -> bool:
@@ -1659,11 +1906,23 @@ def save_my_colors_to_path(path: Path) -> bool:
         return False
 
 
+# True while the library file could not be read: the scene's list is then not the
+# user's library, so autosave must not write it over the file.
+_MY_STORE_LOAD_FAILED = False
+
+
 def load_my_colors() -> None:
-    load_my_colors_from_path(_store_path(), replace=True)
+    global _MY_STORE_LOAD_FAILED
+    path = _store_path()
+    ok, data = _read_my_colors_json(path)
+    _MY_STORE_LOAD_FAILED = not ok
+    if ok and data is not None:
+        _load_my_colors_data(path, data, replace=True)
 
 
 def save_my_colors() -> None:
+    if _MY_STORE_LOAD_FAILED:
+        return
     save_my_colors_to_path(_store_path())
 
 
@@ -1673,9 +1932,65 @@ def save_my_colors() -> None:
 
 _GIANTS_XML_GIANTS_PATH = "$data/shared/brandMaterialTemplates.xml"
 
+
+class _BrandRow(NamedTuple):
+    """One cached brand color row (shared by the GIANTS and POPULAR caches)."""
+    name: str
+    brand: str
+    colorScale: str = ""
+    rgb: Optional[Tuple[float, float, float]] = None
+    title: str = ""
+    parentTemplate: str = ""
+    # Derived once at parse time (sort keys / cross-library name comparisons).
+    name_lc: str = ""
+    name_key: str = ""
+
+
+def _make_brand_row(name: str, brand: str, **fields) -> _BrandRow:
+    return _BrandRow(name, brand, name_lc=name.lower(), name_key=_normalize_color_name_key(name), **fields)
+
+
+class _BrandColumns(NamedTuple):
+    """Column-wise view of one brand's rows (same fields as _BrandRow), used by the visible-list rebuilds."""
+    name: Tuple[str, ...] = ()
+    brand: Tuple[str, ...] = ()
+    colorScale: Tuple[str, ...] = ()
+    rgb: Tuple[Optional[Tuple[float, float, float]], ...] = ()
+    title: Tuple[str, ...] = ()
+    parentTemplate: Tuple[str, ...] = ()
+    name_lc: Tuple[str, ...] = ()
+    name_key: Tuple[str, ...] = ()
+
+
+_EMPTY_BRAND_COLUMNS = _BrandColumns()
+
+
+def _brand_columns(brands: Dict[str, List[_BrandRow]]) -> Dict[str, _BrandColumns]:
+    """Transpose each brand's (already sorted) rows into per-field columns."""
+    return {b: _BrandColumns._make(zip(*rows)) for b, rows in brands.items() if rows}
+
+
+def _flat_rgb_array(rgbs) -> array.array:
+    """Flatten an rgb column for CollectionProperty.foreach_set("color", ...) (missing rgb -> white default).
+
+    foreach_set skips the property's 0..1 min/max clamp that `it.color = rgb` applied,
+    so out-of-range channels (GIANTS rows are parsed unclamped) are clamped here.
+    """
+    flat = array.array("f")
+    for rgb in rgbs:
+        if rgb is None:
+            flat.extend((1.0, 1.0, 1.0))
+        elif min(rgb) < 0.0 or max(rgb) > 1.0:
+            flat.extend((_clamp01(rgb[0]), _clamp01(rgb[1]), _clamp01(rgb[2])))
+        else:
+            flat.extend(rgb)
+    return flat
+
+
 _GIANTS_CACHE_PATH: str = ""
 _GIANTS_CACHE_MTIME: float = -1.0
-_GIANTS_CACHE_BRANDS: Dict[str, List[Dict[str, Any]]] = {}
+_GIANTS_CACHE_BRANDS: Dict[str, List[_BrandRow]] = {}
+_GIANTS_CACHE_COLUMNS: Dict[str, _BrandColumns] = {}
 _GIANTS_CACHE_BRAND_LIST: List[str] = []
 _GIANTS_LAST_ERROR: str = ""
 
@@ -1683,8 +1998,38 @@ _GIANTS_STAT_THROTTLE_S: float = 0.75
 _GIANTS_LAST_STAT_CHECK: float = 0.0
 
 _GIANTS_BRAND_ITEMS_CACHE_SIG = None
-_GIANTS_BRAND_ITEMS_CACHE: List[Tuple[str, str, str]] = []
+_GIANTS_BRAND_ITEMS_CACHE: Tuple[Tuple[str, str, str], ...] = ()
+
+# Shared pool so identical parsed colors (e.g. "1 1 1") are a single tuple across both brand caches.
+_RGB_POOL: Dict[Tuple[float, float, float], Tuple[float, float, float]] = {}
+
+
+def _pool_rgb(rgb: Tuple[float, float, float]) -> Tuple[float, float, float]:
+    return _RGB_POOL.setdefault(rgb, rgb)
+
+
+# colorScale separators: whitespace and/or commas ("0.1 0.2 0.3", "0.1,0.2,0.3", "0.1, 0.2, 0.3").
+_RE_CS_SEP = re.compile(r"[,\s]+")
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_colorscale(cs: str) -> Optional[Tuple[float, float, float]]:
+    """Parse brand XML colorScale text to a pooled (unclamped) rgb tuple, or None.
+
+    Memoized: brand XMLs repeat the same colorScale strings a lot.
+    """
+    if not cs:
+        return None
+    # Common case is plain "r g b": skip the separator regex unless commas are present.
+    parts = _RE_CS_SEP.split(cs.strip(", \t\r\n")) if "," in cs else cs.split()
+    if len(parts) < 3:
+        return None
+    try:
+        return _pool_rgb((float(parts[0]), float(parts[1]), float(parts[2])))
+    except Exception:
+        return None
 
+@functools.lru_cache(maxsize=1024)
 def _parse_color_scale_triplet(text: str) -> Optional[Tuple[float, float, float]]:
     if not text:
         return None
@@ -1709,7 +2054,7 @@ def ensure_giants_cache(*, force: bool = False) -> bool:
     Note: Material Type dropdowns are no longer sourced from this file; see
     ensure_material_templates_cache() for materialTemplates.xml parsing.
     """
-    global _GIANTS_CACHE_PATH, _GIANTS_CACHE_MTIME, _GIANTS_CACHE_BRANDS, _GIANTS_CACHE_BRAND_LIST, _GIANTS_LAST_ERROR
+    global _GIANTS_CACHE_PATH, _GIANTS_CACHE_MTIME, _GIANTS_CACHE_BRANDS, _GIANTS_CACHE_COLUMNS, _GIANTS_CACHE_BRAND_LIST, _GIANTS_LAST_ERROR
 
     global _GIANTS_LAST_STAT_CHECK
     now = time.time()
@@ -1723,6 +2068,7 @@ def ensure_giants_cache(*, force: bool = False) -> bool:
         _GIANTS_CACHE_PATH = ""
         _GIANTS_CACHE_MTIME = -1.0
         _GIANTS_CACHE_BRANDS = {}
+        _GIANTS_CACHE_COLUMNS = {}
         _GIANTS_CACHE_BRAND_LIST = []
         return False
 
@@ -1731,6 +2077,7 @@ def ensure_giants_cache(*, force: bool = False) -> bool:
         _GIANTS_CACHE_PATH = xml_path
         _GIANTS_CACHE_MTIME = -1.0
         _GIANTS_CACHE_BRANDS = {}
+        _GIANTS_CACHE_COLUMNS = {}
         _GIANTS_CACHE_BRAND_LIST = []
         return False
 
@@ -1746,7 +2093,9 @@ def ensure_giants_cache(*, force: bool = False) -> bool:
         tree = ET.parse(xml_path)
         root = tree.getroot()
 
-        brands: Dict[str, List[Dict[str, Any]]] = {}
+        brands: Dict[str, List[_BrandRow]] = {}
+        # One shared (interned) string object per distinct brand key.
+        brand_keys: Dict[str, str] = {}
 
 
         brand_list: List[str] = []
@@ -1760,46 +2109,29 @@ def ensure_giants_cache(*, force: bool = False) -> bool:
         brand_els = root.findall("brand") or root.findall(".//brand")
         if brand_els:
             for brand_el in brand_els:
-                brand_name = (brand_el.attrib.get("name") or "").strip()
+                brand_name = _xml_attr(brand_el.attrib, "name")
                 if not brand_name:
                     continue
+                brand_name = brand_keys.get(brand_name) or brand_keys.setdefault(brand_name, sys.intern(brand_name))
 
                 brand_list.append(brand_name)
 
-                rows: List[Dict[str, Any]] = []
+                rows: List[_BrandRow] = []
                 for color_el in brand_el.findall("color"):
-                    nm = (color_el.attrib.get("name") or "").strip()
-                    r = float(color_el.attrib.get("r", "1.0") or 1.0)
-                    g = float(color_el.attrib.get("g", "1.0") or 1.0)
-                    b = float(color_el.attrib.get("b", "1.0") or 1.0)
-                    pt = (color_el.attrib.get("parentTemplate") or "").strip()
-
-                    rows.append({
-                        "name": nm,
-                        "brand": brand_name,
-                        "rgb": (r, g, b),
-                        "parentTemplate": pt,
-                        "colorScale": "",
-                        "title": "",
-                    })
+                    a = color_el.attrib
+                    nm = _xml_attr(a, "name")
+                    r = float(a.get("r", "1.0") or 1.0)
+                    g = float(a.get("g", "1.0") or 1.0)
+                    b = float(a.get("b", "1.0") or 1.0)
+                    pt = _xml_attr(a, "parentTemplate")
+
+                    rows.append(_make_brand_row(nm, brand_name, rgb=_pool_rgb((r, g, b)), parentTemplate=pt))
 
                 brands[brand_name] = rows
         else:
             # Template-style brandMaterialTemplates.xml
             tpl_els = root.findall("template") or root.findall(".//template")
 
-            def _parse_colorscale(cs: str):
-                if not cs:
-                    return None
-                parts = cs.replace(',', ' ').split()
-                if len(parts) < 3:
-                    return None
-                try:
-                    r, g, b = float(parts[0]), float(parts[1]), float(parts[2])
-                    return (r, g, b)
-                except Exception:
-                    return None
-
             def _canon_brand(brand_value: str, template_name: str) -> str:
                 b = (brand_value or "").strip()
                 if b.lower() in {"none", "null"}:
@@ -1820,40 +2152,34 @@ def ensure_giants_cache(*, force: bool = False) -> bool:
                         return guess.upper()
                 return "Other"
 
+            pt_default = _xml_attr(root.attrib, "parentTemplateDefault")
+
             for tpl in tpl_els:
-                raw_name = (tpl.attrib.get("name") or "").strip()
-                brand_name = _canon_brand((tpl.attrib.get("brand") or ""), raw_name)
-
-                nm = (raw_name or "").strip()
-                pt = (tpl.attrib.get("parentTemplate") or "").strip()
-                if not pt:
-                    pt = (root.attrib.get("parentTemplateDefault") or "").strip()
-                cs = (tpl.attrib.get("colorScale") or "").strip()
+                a = tpl.attrib
+                nm = _xml_attr(a, "name")
+                brand_name = _canon_brand(a.get("brand") or "", nm)
+                brand_name = brand_keys.get(brand_name) or brand_keys.setdefault(brand_name, sys.intern(brand_name))
+
+                pt = _xml_attr(a, "parentTemplate") or pt_default
+                cs = _xml_attr(a, "colorScale")
                 rgb = _parse_colorscale(cs)
 
                 brand_list.append(brand_name)
                 rows = brands.setdefault(brand_name, [])
-                rows.append({
-                    "name": nm,
-                    "brand": brand_name,
-                    "rgb": rgb,
-                    "parentTemplate": pt,
-                    "colorScale": cs,
-                    "title": "",  # NOTE: Do not use localized title in the Color Library
-
-                })
+                # NOTE: Do not use localized title in the Color Library
+                rows.append(_make_brand_row(nm, brand_name, colorScale=cs, rgb=rgb, parentTemplate=pt))
 
-            # Sort each brand's rows by name for stable UI
+            # Sort each brand's rows by name for stable UI (decorate once; index keeps it stable).
             for _b, _rows in brands.items():
-                try:
-                    _rows.sort(key=lambda r: (r.get("name") or "").lower())
-                except Exception:
-                    pass
+                decorated = [(r.name_lc, i, r) for i, r in enumerate(_rows)]
+                decorated.sort()
+                _rows[:] = [r for _low, _i, r in decorated]
 
-        brand_list = sorted(set(brand_list), key=lambda s: s.lower())
+        brand_list = [b for _low, b in sorted((b.lower(), b) for b in set(brand_list))]
         _GIANTS_CACHE_PATH = xml_path
         _GIANTS_CACHE_MTIME = mtime
         _GIANTS_CACHE_BRANDS = brands
+        _GIANTS_CACHE_COLUMNS = _brand_columns(brands)
         _GIANTS_CACHE_BRAND_LIST = brand_list
         _GIANTS_LAST_ERROR = ""
         return True
@@ -1863,6 +2189,7 @@ def ensure_giants_cache(*, force: bool = False) -> bool:
         _GIANTS_CACHE_PATH = xml_path
         _GIANTS_CACHE_MTIME = mtime
         _GIANTS_CACHE_BRANDS = {}
+        _GIANTS_CACHE_COLUMNS = {}
         _GIANTS_CACHE_BRAND_LIST = []
         return False
 
@@ -1880,15 +2207,11 @@ def _giants_brand_items(self, context):
     except Exception:
         pass
 
-    items: List[Tuple[str, str, str]] = []
-    for b in _GIANTS_CACHE_BRAND_LIST:
-        if b == "Other":
-            items.append(("OTHER", "Other", "Templates with no brand attribute"))
-        else:
-            items.append((b, b, ""))
-
-    if not items:
-        items = [("OTHER", "Other", "")]
+    # Immutable tuple: Blender keeps referencing the item strings after the callback returns.
+    items = tuple(
+        ("OTHER", "Other", "Templates with no brand attribute") if b == "Other" else (b, b, "")
+        for b in _GIANTS_CACHE_BRAND_LIST
+    ) or (("OTHER", "Other", ""),)
 
     _GIANTS_BRAND_ITEMS_CACHE_SIG = sig
     _GIANTS_BRAND_ITEMS_CACHE = items
@@ -1913,9 +2236,14 @@ class I3D_CL_GiantsColorItem(bpy.types.PropertyGroup):
     xml_selected: bpy.props.BoolProperty(name="Select", default=False, update=_on_xml_selected_giants)
 
 
+# {scene_name: (brand_id, cache_mtime)} of the last successful visible-list rebuild.
+_GIANTS_VISIBLE_BRAND: Dict[str, Tuple[str, float]] = {}
+
+
 def rebuild_giants_visible(scene: bpy.types.Scene, *, force: bool = False) -> None:
     scene.i3d_cl_giants_colors.clear()
     scene.i3d_cl_giants_index = 0
+    _GIANTS_VISIBLE_BRAND.pop(scene.name, None)
 
     if not ensure_giants_cache(force=force):
         return
@@ -1923,34 +2251,50 @@ def rebuild_giants_visible(scene: bpy.types.Scene, *, force: bool = False) -> No
     brand_id = getattr(scene, "i3d_cl_giants_brand", "OTHER")
     brand_key = "Other" if brand_id == "OTHER" else brand_id
 
-    rows = _GIANTS_CACHE_BRANDS.get(brand_key, [])
-    for r in rows:
-        it = scene.i3d_cl_giants_colors.add()
-        it.name = r.get("name", "")
-        it.brand = r.get("brand", "")
-        it.colorScale = r.get("colorScale", "")
-        it.title = r.get("title", "")
-        it.parentTemplate = r.get("parentTemplate", "")
-        rgb = r.get("rgb")
-        if rgb:
-            it.color = rgb
-
-        # Restore XML selection state
+    cols = _GIANTS_CACHE_COLUMNS.get(brand_key, _EMPTY_BRAND_COLUMNS)
+    names, brands, color_scales, titles, parents, rgbs = cols.name, cols.brand, cols.colorScale, cols.title, cols.parentTemplate, cols.rgb
+    coll = scene.i3d_cl_giants_colors
+    for i in range(len(names)):
+        it = coll.add()
+        it.name = names[i]
+        it.brand = brands[i]
+        # Empty strings are the property defaults; skip those RNA writes.
+        if color_scales[i]:
+            it.colorScale = color_scales[i]
+        if titles[i]:
+            it.title = titles[i]
+        if parents[i]:
+            it.parentTemplate = parents[i]
+
+    if names:
+        coll.foreach_set("color", _flat_rgb_array(rgbs))
+
+    # Restore XML selection state (nothing to restore in the common no-selection case).
+    if names and _xml_any_color_selected(scene):
         global _XML_SYNC_SUSPEND
         _XML_SYNC_SUSPEND = True
         try:
-            it.xml_selected = (_xml_find_selected(scene, _xml_key_for_giants(it)) >= 0)
-        except Exception:
-            pass
-        _XML_SYNC_SUSPEND = False
+            for it in coll:
+                try:
+                    it.xml_selected = (_xml_find_selected(scene, _xml_key_for_giants(it)) >= 0)
+                except Exception:
+                    pass
+        finally:
+            _XML_SYNC_SUSPEND = False
 
-    if rows:
+    if names:
         scene.i3d_cl_giants_index = 0
 
+    _GIANTS_VISIBLE_BRAND[scene.name] = (brand_id, _GIANTS_CACHE_MTIME)
+
 
 def _on_brand_update(self, context):
     try:
-        rebuild_giants_visible(context.scene)
+        scene = context.scene
+        # Blender also fires this when the UI re-assigns the same brand; keep the already built list.
+        if len(scene.i3d_cl_giants_colors) and _GIANTS_VISIBLE_BRAND.get(scene.name) == (scene.i3d_cl_giants_brand, _GIANTS_CACHE_MTIME):
+            return
+        rebuild_giants_visible(scene)
     except Exception:
         pass
 
@@ -2028,7 +2372,8 @@ def _deferred_rebuild_timer():
     except Exception:
         _DEFERRED_REBUILD_TIMER_RUNNING = False
         return None
-_POPULAR_CACHE_BRANDS: Dict[str, List[Dict[str, Any]]] = {}
+_POPULAR_CACHE_BRANDS: Dict[str, List[_BrandRow]] = {}
+_POPULAR_CACHE_COLUMNS: Dict[str, _BrandColumns] = {}
 _POPULAR_CACHE_BRAND_LIST: List[str] = []
 _POPULAR_LAST_ERROR: str = ""
 
@@ -2036,7 +2381,7 @@ _POPULAR_STAT_THROTTLE_S: float = 0.75
 _POPULAR_LAST_STAT_CHECK: float = 0.0
 
 _POPULAR_BRAND_ITEMS_CACHE_SIG = None
-_POPULAR_BRAND_ITEMS_CACHE: List[Tuple[str, str, str]] = []
+_POPULAR_BRAND_ITEMS_CACHE: Tuple[Tuple[str, str, str], ...] = ()
 
 
 def _popular_xml_resolve_path() -> str:
@@ -2052,7 +2397,7 @@ def ensure_popular_cache(*, force: bool = False) -> bool:
 
     Returns True when cache is ready; False when file missing or parse failed.
     """
-    global _POPULAR_CACHE_PATH, _POPULAR_CACHE_MTIME, _POPULAR_CACHE_BRANDS, _POPULAR_CACHE_BRAND_LIST, _POPULAR_LAST_ERROR
+    global _POPULAR_CACHE_PATH, _POPULAR_CACHE_MTIME, _POPULAR_CACHE_BRANDS, _POPULAR_CACHE_COLUMNS, _POPULAR_CACHE_BRAND_LIST, _POPULAR_LAST_ERROR
 
     global _POPULAR_LAST_STAT_CHECK
     now = time.time()
@@ -2066,6 +2411,7 @@ def ensure_popular_cache(*, force: bool = False) -> bool:
         _POPULAR_CACHE_PATH = ""
         _POPULAR_CACHE_MTIME = -1.0
         _POPULAR_CACHE_BRANDS = {}
+        _POPULAR_CACHE_COLUMNS = {}
         _POPULAR_CACHE_BRAND_LIST = []
         return False
 
@@ -2074,6 +2420,7 @@ def ensure_popular_cache(*, force: bool = False) -> bool:
         _POPULAR_CACHE_PATH = xml_path
         _POPULAR_CACHE_MTIME = -1.0
         _POPULAR_CACHE_BRANDS = {}
+        _POPULAR_CACHE_COLUMNS = {}
         _POPULAR_CACHE_BRAND_LIST = []
         return False
 
@@ -2089,36 +2436,37 @@ def ensure_popular_cache(*, force: bool = False) -> bool:
         tree = ET.parse(xml_path)
         root = tree.getroot()
 
-        brands: Dict[str, List[Dict[str, Any]]] = {}
-        OTHER = "Other"
+        brands: Dict[str, List[_BrandRow]] = {}
+        OTHER = sys.intern("Other")
+        # One shared (interned) string object per distinct brand key.
+        brand_keys: Dict[str, str] = {OTHER: OTHER}
         parent_templates: Set[str] = set()
 
-        for el in root.iter():
-            # Expecting <template .../>
-            if (str(el.tag).split("}")[-1] != "template"):
-                continue
-            nm = (el.attrib.get("name") or "").strip()
-            cs = (el.attrib.get("colorScale") or "").strip()
+        # Expecting <template .../>; resolve the (optional) root namespace once and let
+        # iter() do the tag filtering instead of parsing every element's localname.
+        root_tag = str(root.tag)
+        ns = root_tag[1:].split("}", 1)[0] if root_tag.startswith("{") else ""
+        template_tag = f"{{{ns}}}template" if ns else "template"
+
+        for el in root.iter(template_tag):
+            a = el.attrib
+            nm = _xml_attr(a, "name")
+            cs = _xml_attr(a, "colorScale")
+            # Whitespace-separated, clamped, bad tokens read as 0.0 (matches _apply_giants_colorscale).
             trip = _parse_color_scale_triplet(cs)
             if (not nm) or (trip is None):
                 continue
-            brand = (el.attrib.get("brand") or "").strip()
-            if not brand:
-                brand = OTHER
+            trip = _pool_rgb(trip)
+            brand = _xml_attr(a, "brand") or OTHER
+            brand = brand_keys.get(brand) or brand_keys.setdefault(brand, sys.intern(brand))
 
-            row = {
-                "name": nm,
-                "brand": brand,
-                "colorScale": cs,
-                "rgb": trip,
-                "title": (el.attrib.get("title") or "").strip(),
-            }
+            row = _make_brand_row(nm, brand, colorScale=cs, rgb=trip, title=_xml_attr(a, "title"))
 
             brands.setdefault(brand, []).append(row)
 
         # Sort
         for b in brands.keys():
-            brands[b].sort(key=lambda r: (r.get("name") or ""))
+            brands[b].sort(key=attrgetter("name"))
         brand_list = sorted([b for b in brands.keys() if b != OTHER])
         if OTHER in brands:
             brand_list.append(OTHER)
@@ -2126,6 +2474,7 @@ def ensure_popular_cache(*, force: bool = False) -> bool:
         _POPULAR_CACHE_PATH = xml_path
         _POPULAR_CACHE_MTIME = mtime
         _POPULAR_CACHE_BRANDS = brands
+        _POPULAR_CACHE_COLUMNS = _brand_columns(brands)
         _POPULAR_CACHE_BRAND_LIST = brand_list
         _POPULAR_LAST_ERROR = ""
         return True
@@ -2135,6 +2484,7 @@ def ensure_popular_cache(*, force: bool = False) -> bool:
         _POPULAR_CACHE_PATH = xml_path
         _POPULAR_CACHE_MTIME = mtime
         _POPULAR_CACHE_BRANDS = {}
+        _POPULAR_CACHE_COLUMNS = {}
         _POPULAR_CACHE_BRAND_LIST = []
         return False
 
@@ -2152,15 +2502,11 @@ def _popular_brand_items(self, context):
     except Exception:
         pass
 
-    items: List[Tuple[str, str, str]] = []
-    for b in _POPULAR_CACHE_BRAND_LIST:
-        if b == "Other":
-            items.append(("OTHER", "Other", "Templates with no brand attribute"))
-        else:
-            items.append((b, b, ""))
-
-    if not items:
-        items = [("OTHER", "Other", "")]
+    # Immutable tuple: Blender keeps referencing the item strings after the callback returns.
+    items = tuple(
+        ("OTHER", "Other", "Templates with no brand attribute") if b == "Other" else (b, b, "")
+        for b in _POPULAR_CACHE_BRAND_LIST
+    ) or (("OTHER", "Other", ""),)
 
     _POPULAR_BRAND_ITEMS_CACHE_SIG = sig
     _POPULAR_BRAND_ITEMS_CACHE = items
@@ -2197,9 +2543,14 @@ class I3D_CL_PopularColorItem(bpy.types.PropertyGroup):
     xml_selected: bpy.props.BoolProperty(name="Select", default=False, update=_on_xml_selected_popular)
 
 
+# {scene_name: (brand_id, cache_mtime)} of the last successful visible-list rebuild.
+_POPULAR_VISIBLE_BRAND: Dict[str, Tuple[str, float]] = {}
+
+
 def rebuild_popular_visible(scene: bpy.types.Scene, *, force: bool = False) -> None:
     scene.i3d_cl_popular_colors.clear()
     scene.i3d_cl_popular_index = 0
+    _POPULAR_VISIBLE_BRAND.pop(scene.name, None)
 
     if not ensure_popular_cache(force=force):
         return
@@ -2207,41 +2558,56 @@ def rebuild_popular_visible(scene: bpy.types.Scene, *, force: bool = False) -> N
     brand_id = getattr(scene, "i3d_cl_popular_brand", "OTHER")
     brand_key = "Other" if brand_id == "OTHER" else brand_id
 
-    rows = _POPULAR_CACHE_BRANDS.get(brand_key, [])
-    for r in rows:
-        it = scene.i3d_cl_popular_colors.add()
-        it.name = r.get("name", "")
-        it.brand = r.get("brand", "")
-        it.colorScale = r.get("colorScale", "")
-        it.title = r.get("title", "")
-        rgb = r.get("rgb")
-        if rgb:
-            it.color = rgb
-
-        # Restore XML selection state
+    cols = _POPULAR_CACHE_COLUMNS.get(brand_key, _EMPTY_BRAND_COLUMNS)
+    names, brands, color_scales, titles, rgbs = cols.name, cols.brand, cols.colorScale, cols.title, cols.rgb
+    coll = scene.i3d_cl_popular_colors
+    for i in range(len(names)):
+        it = coll.add()
+        it.name = names[i]
+        it.brand = brands[i]
+        # Empty strings are the property defaults; skip those RNA writes.
+        if color_scales[i]:
+            it.colorScale = color_scales[i]
+        if titles[i]:
+            it.title = titles[i]
+
+    if names:
+        coll.foreach_set("color", _flat_rgb_array(rgbs))
+
+    # Restore XML selection state (nothing to restore in the common no-selection case).
+    if names and _xml_any_color_selected(scene):
         global _XML_SYNC_SUSPEND
         _XML_SYNC_SUSPEND = True
         try:
-            sel_idx = _xml_find_selected(scene, _xml_key_for_popular(it))
-            it.xml_selected = (sel_idx >= 0)
-            if sel_idx >= 0:
-                mt = (scene.i3d_cl_xml_selected_colors[sel_idx].materialTemplate or "").strip()
-                # POPULAR library presets must never use forced-color templates (they override swatch).
-                if mt and (not _mtpl_forces_color_change(mt)):
-                    it.xml_material_template = _mt_register_value(mt)
-                else:
-                    it.xml_material_template = "NONE"
-        except Exception:
-            pass
-        _XML_SYNC_SUSPEND = False
+            for it in coll:
+                try:
+                    sel_idx = _xml_find_selected(scene, _xml_key_for_popular(it))
+                    it.xml_selected = (sel_idx >= 0)
+                    if sel_idx >= 0:
+                        mt = (scene.i3d_cl_xml_selected_colors[sel_idx].materialTemplate or "").strip()
+                        # POPULAR library presets must never use forced-color templates (they override swatch).
+                        if mt and (not _mtpl_forces_color_change(mt)):
+                            it.xml_material_template = _mt_register_value(mt)
+                        else:
+                            it.xml_material_template = "NONE"
+                except Exception:
+                    pass
+        finally:
+            _XML_SYNC_SUSPEND = False
 
-    if rows:
+    if names:
         scene.i3d_cl_popular_index = 0
 
+    _POPULAR_VISIBLE_BRAND[scene.name] = (brand_id, _POPULAR_CACHE_MTIME)
+
 
 def _on_popular_brand_update(self, context):
     try:
-        rebuild_popular_visible(context.scene)
+        scene = context.scene
+        # Blender also fires this when the UI re-assigns the same brand; keep the already built list.
+        if len(scene.i3d_cl_popular_colors) and _POPULAR_VISIBLE_BRAND.get(scene.name) == (scene.i3d_cl_popular_brand, _POPULAR_CACHE_MTIME):
+            return
+        rebuild_popular_visible(scene)
     except Exception:
         pass
 
@@ -2303,7 +2669,7 @@ def _all_library_existing_name_key_set(scene, *, exclude_my_item=None) -> set:
     try:
         for rows in (_GIANTS_CACHE_BRANDS or {}).values():
             for r in (rows or []):
-                k = _normalize_color_name_key((r or {}).get("name", "") or "")
+                k = r.name_key
                 if k:
                     keys.add(k)
     except Exception:
@@ -2317,7 +2683,7 @@ def _all_library_existing_name_key_set(scene, *, exclude_my_item=None) -> set:
     try:
         for rows in (_POPULAR_CACHE_BRANDS or {}).values():
             for r in (rows or []):
-                k = _normalize_color_name_key((r or {}).get("name", "") or "")
+                k = r.name_key
                 if k:
                     keys.add(k)
     except Exception:
@@ -2342,6 +2708,10 @@ def _all_library_existing_name_key_set(scene, *, exclude_my_item=None) -> set:
     return keys
 
 
+_RE_CONST_CASE_NAME = re.compile(r"[A-Z0-9_]+")
+_RE_TRAILING_NUMBER = re.compile(r"^(.*?)(?:\s+)?(\d+)$")
+
+
 def _ensure_unique_my_library_name(scene, desired_name: str, *, exclude_my_item=None) -> str:
     """Ensure the desired name does not duplicate any existing name in ANY library.
 
@@ -2354,18 +2724,26 @@ def _ensure_unique_my_library_name(scene, desired_name: str, *, exclude_my_item=
               Red -> Red 2 -> Red 3 ...
               Red 2 -> Red 3 ...
     """
+    existing = _all_library_existing_name_key_set(scene, exclude_my_item=exclude_my_item)
+    return _unique_name_in_key_set(desired_name, existing)
+
+
+def _unique_name_in_key_set(desired_name: str, existing: Set[str]) -> str:
+    """Suffix `desired_name` until its name key is not in `existing` (see _ensure_unique_my_library_name).
+
+    Does not modify `existing`; batch callers add the returned name's key themselves.
+    """
     desired = (desired_name or "").strip() or "New Color"
     desired = desired[:80]
-    existing = _all_library_existing_name_key_set(scene, exclude_my_item=exclude_my_item)
 
     if _normalize_color_name_key(desired) not in existing:
         return desired
 
     # Decide suffix style: underscore or CONSTANT_CASE names get compact numeric suffix.
-    use_compact = ("_" in desired) or bool(re.fullmatch(r"[A-Z0-9_]+", desired))
+    use_compact = ("_" in desired) or bool(_RE_CONST_CASE_NAME.fullmatch(desired))
 
     # Split trailing digits (with or without whitespace).
-    m = re.match(r"^(.*?)(?:\s+)?(\d+)$", desired)
+    m = _RE_TRAILING_NUMBER.match(desired)
     if m:
         base = (m.group(1) or "").strip() or "New Color"
         try:
@@ -2385,6 +2763,33 @@ def _ensure_unique_my_library_name(scene, desired_name: str, *, exclude_my_item=
 
 
 
+def _add_library_items_to_my_library(scene, coll, indices) -> int:
+    """Copy `coll[i]` for each valid index into My Color Library; returns the number added.
+
+    The cross-library name-key set is built once for the whole batch, and the
+    library is saved once at the end.
+    """
+    existing = _all_library_existing_name_key_set(scene)
+    my_colors = scene.i3d_cl_my_colors
+    n = len(coll)
+    added = 0
+    for i in indices:
+        if not (0 <= i < n):
+            continue
+        g = coll[i]
+        unique_name = _unique_name_in_key_set(g.name, existing)
+        existing.add(_normalize_color_name_key(unique_name))
+        it = my_colors.add()
+        it.name = unique_name
+        it.color = g.color
+        added += 1
+
+    if added:
+        scene.i3d_cl_my_index = len(my_colors) - 1
+        schedule_save()
+    return added
+
+
 class I3D_CL_OT_MyAdd(bpy.types.Operator):
     bl_idname = "i3d.cl_my_add"
     bl_label = "Add Color"
@@ -2410,10 +2815,10 @@ class I3D_CL_OT_MyRemove(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_my_index
-        if 0 <= idx < len(scene.i3d_cl_my_colors):
-            scene.i3d_cl_my_colors.remove(idx)
-            scene.i3d_cl_my_index = min(idx, max(0, len(scene.i3d_cl_my_colors) - 1))
+        idx, coll = _GET_MY_SELECTION(scene)
+        if 0 <= idx < len(coll):
+            coll.remove(idx)
+            scene.i3d_cl_my_index = min(idx, max(0, len(coll) - 1))
             schedule_save()
         return {'FINISHED'}
 
@@ -2438,49 +2843,49 @@ class I3D_CL_OT_MySortBySelectedMaterial(bpy.types.Operator):
             self.report({'WARNING'}, "No color selected")
             return {'CANCELLED'}
 
-        active_item = col[idx]
-        active_ptr = active_item.as_pointer()
-        target_mt = _xml_material_template_from_item(active_item) or ""
+        target_mt = _xml_material_template_from_item(col[idx]) or ""
 
-        items = list(col)
-
-        if not target_mt:
-            # No material selected -> just sort by Name (keep the active row on top).
-            def _key(it):
-                ptr = it.as_pointer()
-                nm = (it.name or "").lower()
-                return (0 if ptr == active_ptr else 1, nm)
-        else:
-            def _key(it):
-                ptr = it.as_pointer()
+        # Build every sort key in one pass, then sort row indices (stable) on them.
+        keys = []
+        for i, it in enumerate(col):
+            nm = (it.name or "").lower()
+            if not target_mt:
+                # No material selected -> just sort by Name (keep the active row on top).
+                keys.append((0 if i == idx else 1, nm))
+            else:
                 mt = _xml_material_template_from_item(it) or ""
-                nm = (it.name or "").lower()
-                return (
-                    0 if ptr == active_ptr else (1 if mt == target_mt else 2),
-                    mt.lower(),
-                    nm,
-                )
+                keys.append((0 if i == idx else (1 if mt == target_mt else 2), mt.lower(), nm))
 
-        desired = sorted(items, key=_key)
-        desired_ptrs = [it.as_pointer() for it in desired]
-        current_ptrs = [it.as_pointer() for it in col]
+        n = len(keys)
+        order = sorted(range(n), key=keys.__getitem__)
 
         # Reorder using CollectionProperty.move (keeps the same PropertyGroup instances).
-        for i, ptr in enumerate(desired_ptrs):
-            try:
-                j = current_ptrs.index(ptr)
-            except ValueError:
-                continue
+        # Rows not placed yet keep their original relative order, so the current position of
+        # original row o is (rows already placed) + (unplaced rows that started above o).
+        # A Fenwick tree over "still unplaced" keeps that count O(log n) per move.
+        tree = [0] * (n + 1)
+        for k in range(1, n + 1):
+            tree[k] += 1
+            parent = k + (k & -k)
+            if parent <= n:
+                tree[parent] += tree[k]
+
+        for i, o in enumerate(order):
+            above = 0
+            k = o
+            while k > 0:
+                above += tree[k]
+                k -= k & -k
+            j = i + above
             if j != i:
                 col.move(j, i)
-                moved = current_ptrs.pop(j)
-                current_ptrs.insert(i, moved)
+            k = o + 1
+            while k <= n:
+                tree[k] -= 1
+                k += k & -k
 
         # Restore active index (same row as before sorting).
-        try:
-            scene.i3d_cl_my_index = current_ptrs.index(active_ptr)
-        except Exception:
-            scene.i3d_cl_my_index = min(max(0, idx), max(0, len(col) - 1))
+        scene.i3d_cl_my_index = order.index(idx)
 
         schedule_save()
 
@@ -2669,23 +3074,51 @@ class I3D_CL_OT_MyClearUnusedDecals(bpy.types.Operator):
             self.report({'ERROR'}, "Could not resolve decal cache folder")
             return {'CANCELLED'}
 
+        # Only the first block is hashed as a cheap pre-filter for same-size files.
+        head_bytes = 64 * 1024
+
+        # Scan store dir once; every later step works from this snapshot.
+        files = []
+        stats = {}
+        try:
+            with os.scandir(store_dir) as it:
+                for e in it:
+                    if e.name == _DECAL_CACHE_INDEX_FILENAME:
+                        continue
+                    try:
+                        if not e.is_file():
+                            continue
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    p = Path(e.path)
+                    files.append(p)
+                    stats[p] = st
+        except Exception:
+            self.report({'ERROR'}, "Could not read decal cache folder")
+            return {'CANCELLED'}
+        removed = set()  # names unlinked during this run
+
         # Collect decals referenced by My Color Library (by filename within the store dir).
         used_names = set()
+        existing_store_names = {p.name.lower() for p in files}
+        store_prefix = None
         try:
             for c in getattr(scene, "i3d_cl_my_colors", []):
                 fp = str(getattr(c, "decal_image_path", "") or "").strip()
                 if not fp:
                     continue
                 try:
-                    p = Path(fp)
-                    name = p.name
-                    if name and (store_dir / name).exists():
-                        used_names.add(name.lower())
+                    name = os.path.basename(fp).lower()
+                    if name and name in existing_store_names:
+                        used_names.add(name)
                         continue
                     # If the stored path points inside the store dir, include it too.
                     try:
-                        rp = p.resolve()
-                        if (rp.parent == store_dir) or (store_dir in rp.parents):
+                        if store_prefix is None:
+                            store_prefix = os.path.normcase(str(store_dir.resolve())).rstrip(os.sep) + os.sep
+                        rp = Path(fp).resolve()
+                        if os.path.normcase(str(rp)).startswith(store_prefix):
                             used_names.add(rp.name.lower())
                     except Exception:
                         pass
@@ -2694,112 +3127,171 @@ class I3D_CL_OT_MyClearUnusedDecals(bpy.types.Operator):
         except Exception:
             pass
 
-        # Helper: hash file contents (for dedupe).
-        def _sha1_file(p: Path) -> str:
-            h = hashlib.sha1()
-            with p.open("rb") as f:
-                for chunk in iter(lambda: f.read(1024 * 1024), b""):
-                    h.update(chunk)
-            return h.hexdigest()
-
-        # Scan store dir for files.
-        files = []
-        try:
-            for p in store_dir.iterdir():
-                if not p.is_file():
-                    continue
-                if p.name == _DECAL_CACHE_INDEX_FILENAME:
-                    continue
-                files.append(p)
-        except Exception:
-            self.report({'ERROR'}, "Could not read decal cache folder")
-            return {'CANCELLED'}
-
         # 1) Dedupe by content hash (update library refs to canonical file, then delete duplicates).
         duplicates_deleted = 0
         refs_updated = 0
         hash_groups = {}
+        to_delete = []  # [(path, is_duplicate)], unlinked after all decisions are made
+        duplicate_names = set()
+
+        # Digests from the previous pass, reused while (size, mtime_ns) still match.
+        digest_algo = _content_digest_algo()
+        try:
+            prev = _load_decal_cache_index().get(_DECAL_DIGEST_CACHE_KEY) or {}
+            prev_digests = (prev.get("files") or {}) if prev.get("algo") == digest_algo else {}
+        except Exception:
+            prev_digests = {}
+        digests = {}  # {filename: [digest, size, mtime_ns]} for the index written back in step 3
+
+        # Only same-size files can be identical: unique sizes are never read at all.
+        by_size = {}
         for p in files:
+            by_size.setdefault(stats[p].st_size, []).append(p)
+
+        def _remember(p: Path, hh: str) -> None:
+            st = stats[p]
+            digests[p.name] = [hh, st.st_size, st.st_mtime_ns]
+
+        def _try_digest(p: Path, limit: Optional[int] = None) -> str:
+            # One unreadable file must not abort the whole pass.
             try:
-                hh = _sha1_file(p)
+                return _content_digest(p, limit)
             except Exception:
-                continue
-            hash_groups.setdefault(hh, []).append(p)
+                return ""
 
-        # Update references + delete duplicate files
-        for hh, group in hash_groups.items():
+        # hashlib releases the GIL while hashing, so worker threads overlap reads and hashing.
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as pool:
+            head_candidates = []
+            full_candidates = []
+            for size, same_size in by_size.items():
+                if len(same_size) <= 1:
+                    continue
+                unknown = []
+                for p in same_size:
+                    st = stats[p]
+                    prev_entry = prev_digests.get(p.name)
+                    if prev_entry and prev_entry[1:] == [st.st_size, st.st_mtime_ns]:
+                        _remember(p, prev_entry[0])
+                        hash_groups.setdefault(prev_entry[0], []).append(p)
+                    else:
+                        unknown.append(p)
+                if len(unknown) < len(same_size):
+                    # Some digests are already known: the rest must be fully hashed to compare against them.
+                    full_candidates.extend(p for p in unknown if size > head_bytes)
+                    head_candidates.extend((size, p) for p in unknown if size <= head_bytes)
+                else:
+                    head_candidates.extend((size, p) for p in unknown)
+
+            # Split same-size files by head hash first; small files are fully covered by the head read,
+            # so their head hash is already the full content digest.
+            heads = pool.map(lambda sp: _try_digest(sp[1], head_bytes), head_candidates)
+            by_head = {}
+            for (size, p), head in zip(head_candidates, heads):
+                if not head:
+                    continue
+                if size <= head_bytes:
+                    _remember(p, head)
+                    hash_groups.setdefault(head, []).append(p)
+                else:
+                    by_head.setdefault((size, head), []).append(p)
+
+            for candidates in by_head.values():
+                if len(candidates) > 1:
+                    full_candidates.extend(candidates)
+
+            _prefetch_for_digest(full_candidates)
+            for p, hh in zip(full_candidates, pool.map(_try_digest, full_candidates)):
+                if hh:
+                    _remember(p, hh)
+                    hash_groups.setdefault(hh, []).append(p)
+
+        # Library entries by referenced filename, so each duplicate redirects only its own users.
+        name_to_entries = {}
+        try:
+            for c in getattr(scene, "i3d_cl_my_colors", []):
+                fp = str(getattr(c, "decal_image_path", "") or "").strip()
+                if not fp:
+                    continue
+                try:
+                    name_to_entries.setdefault(os.path.basename(fp).lower(), []).append(c)
+                except Exception:
+                    continue
+        except Exception:
+            pass
+
+        # Update references + delete duplicate files
+        try:
+            store_dir_resolved = store_dir.resolve()
+        except Exception:
+            store_dir_resolved = store_dir
+        for hh, group in hash_groups.items():
             if len(group) <= 1:
                 continue
             # Pick canonical: prefer a referenced filename; else first sorted name.
-            group_sorted = sorted(group, key=lambda x: x.name.lower())
-            canonical = None
-            for p in group_sorted:
-                if p.name.lower() in used_names:
-                    canonical = p
-                    break
-            if canonical is None:
-                canonical = group_sorted[0]
-            canon_path = str((store_dir / canonical.name).resolve())
+            named = sorted(((p.name.lower(), p) for p in group), key=lambda t: t[0])
+            canon_name, canonical = next((t for t in named if t[0] in used_names), named[0])
+            dups = [t for t in named if t[0] != canon_name]
+            canon_path = str(store_dir_resolved / canonical.name)
             # Redirect any library entries referencing duplicates to canonical
             try:
-                for c in getattr(scene, "i3d_cl_my_colors", []):
-                    fp = str(getattr(c, "decal_image_path", "") or "").strip()
-                    if not fp:
-                        continue
-                    try:
-                        nm = Path(fp).name.lower()
-                    except Exception:
-                        continue
-                    if nm == canonical.name.lower():
-                        continue
-                    if nm in {p2.name.lower() for p2 in group_sorted[1:]}:
+                for nm, _p in dups:
+                    for c in name_to_entries.get(nm, ()):
                         c.decal_image_path = canon_path
                         refs_updated += 1
-                if refs_updated:
-                    schedule_save()
             except Exception:
                 pass
             # Refresh used names (canonical is used if any duplicate was used)
-            if any(p.name.lower() in used_names for p in group_sorted):
-                used_names.add(canonical.name.lower())
-            # Delete other duplicates
-            for p in group_sorted:
-                if p.name.lower() == canonical.name.lower():
-                    continue
-                try:
-                    p.unlink()
-                    duplicates_deleted += 1
-                except Exception:
-                    pass
+            if any(nm in used_names for nm, _p in dups):
+                used_names.add(canon_name)
+            # Queue other duplicates for deletion
+            for _nm, p in dups:
+                to_delete.append((p, True))
+                duplicate_names.add(p.name)
+        if refs_updated:
+            schedule_save()
 
-        # 2) Delete any unused files (not referenced by My Color Library).
+        # 2) Queue any unused files (not referenced by My Color Library).
         deleted_unused = 0
         kept = 0
-        try:
-            for p in store_dir.iterdir():
-                if not p.is_file():
-                    continue
-                if p.name == _DECAL_CACHE_INDEX_FILENAME:
-                    continue
-                if p.name.lower() in used_names:
-                    kept += 1
-                    continue
-                try:
-                    p.unlink()
-                    deleted_unused += 1
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        for p in files:
+            if p.name in duplicate_names:
+                continue
+            if p.name.lower() in used_names:
+                kept += 1
+                continue
+            to_delete.append((p, False))
+
+        # Unlink everything in one pass, in inode order for directory locality.
+        to_delete.sort(key=lambda t: stats[t[0]].st_ino)
+        for p, is_duplicate in to_delete:
+            try:
+                p.unlink()
+            except Exception:
+                continue
+            removed.add(p.name)
+            if is_duplicate:
+                duplicates_deleted += 1
+            else:
+                deleted_unused += 1
+        remaining = {p.name for p in files} - removed
 
         # 3) Clean/update decal cache index to reflect current files.
         try:
             idx = _load_decal_cache_index()
             changed = False
             for h, fname in list(idx.items()):
-                if not (store_dir / fname).exists():
+                if h == _DECAL_DIGEST_CACHE_KEY:
+                    continue
+                if fname not in remaining:
                     idx.pop(h, None)
                     changed = True
+            digest_entry = {
+                "algo": digest_algo,
+                "files": {n: v for n, v in digests.items() if n in remaining},
+            }
+            if idx.get(_DECAL_DIGEST_CACHE_KEY) != digest_entry:
+                idx[_DECAL_DIGEST_CACHE_KEY] = digest_entry
+                changed = True
             if changed:
                 _save_decal_cache_index(idx)
         except Exception:
@@ -2815,6 +3307,7 @@ class I3D_CL_OT_MyReload(bpy.types.Operator):
 
     def execute(self, context):
         load_my_colors()
+        _IMG_CACHE.clear()
         self.report({'INFO'}, "Reloaded colors")
         return {'FINISHED'}
 
@@ -2829,15 +3322,8 @@ def _material_get_basecolor_image_filepath(mat: bpy.types.Material) -> str:
     """Return filepath of the image node currently driving Principled Base Color (if any)."""
     if not mat or not getattr(mat, "use_nodes", False) or not getattr(mat, "node_tree", None):
         return ""
-    nt = mat.node_tree
-    nodes = nt.nodes
     # Prefer named Principled; fall back to first Principled.
-    bsdf = nodes.get("Principled BSDF")
-    if bsdf is None:
-        for n in nodes:
-            if getattr(n, "type", "") == 'BSDF_PRINCIPLED':
-                bsdf = n
-                break
+    bsdf = _find_principled_bsdf(mat)
     if bsdf is None:
         return ""
     inp = None
@@ -2868,9 +3354,10 @@ def _apply_color_to_material(mat: bpy.types.Material, col: Tuple[float, float, f
     # Prefer node-based materials
     if getattr(mat, "use_nodes", False) and getattr(mat, "node_tree", None):
         try:
-            bsdf = mat.node_tree.nodes.get("Principled BSDF")
-            if bsdf and "Base Color" in bsdf.inputs:
-                bsdf.inputs["Base Color"].default_value = (col[0], col[1], col[2], 1.0)
+            bsdf = _find_principled_bsdf(mat)
+            inp = bsdf.inputs.get("Base Color") if bsdf else None
+            if inp is not None:
+                inp.default_value = (col[0], col[1], col[2], 1.0)
                 return True
         except Exception:
             pass
@@ -2905,19 +3392,40 @@ def _set_bsdf_input(bsdf: bpy.types.Node, name_variants, value) -> bool:
     return False
 
 
+# node_tree.as_pointer() -> name of its Principled BSDF. Only node names are kept (never node
+# references, which go stale across undo); a hit is re-validated by name + type before use.
+_BSDF_NAME_CACHE: Dict[int, str] = {}
+_BSDF_NAME_CACHE_MAX = 4096
+
+
 def _find_principled_bsdf(mat: bpy.types.Material):
     if not mat or not getattr(mat, "use_nodes", False) or not getattr(mat, "node_tree", None):
         return None
-    nodes = mat.node_tree.nodes
+    nt = mat.node_tree
+    nodes = nt.nodes
+    try:
+        key = nt.as_pointer()
+    except Exception:
+        key = None
+    cached = _BSDF_NAME_CACHE.get(key) if key is not None else None
+    if cached:
+        bsdf = nodes.get(cached)
+        if bsdf and getattr(bsdf, "type", "") == 'BSDF_PRINCIPLED':
+            return bsdf
     # Prefer the default name when present.
     bsdf = nodes.get("Principled BSDF")
-    if bsdf and getattr(bsdf, "type", "") == 'BSDF_PRINCIPLED':
-        return bsdf
-    # Fallback: first Principled node.
-    for n in nodes:
-        if getattr(n, "type", "") == 'BSDF_PRINCIPLED':
-            return n
-    return None
+    if not (bsdf and getattr(bsdf, "type", "") == 'BSDF_PRINCIPLED'):
+        bsdf = None
+        # Fallback: first Principled node (remembered in _BSDF_NAME_CACHE below).
+        for n in nodes:
+            if getattr(n, "type", "") == 'BSDF_PRINCIPLED':
+                bsdf = n
+                break
+    if bsdf is not None and key is not None:
+        if len(_BSDF_NAME_CACHE) >= _BSDF_NAME_CACHE_MAX:
+            _BSDF_NAME_CACHE.clear()
+        _BSDF_NAME_CACHE[key] = bsdf.name
+    return bsdf
 
 
 # --- Material preview presets (Blender viewport approximation) ---
@@ -2995,73 +3503,85 @@ _PREVIEW_PRESETS = {
 }
 
 
-def _guess_preview_preset_id(material_template_name: str):
-    if not material_template_name:
-        return None
-
-    s = material_template_name.strip().lower()
+# Keyword -> group; "scratched"/"metallic" are covered by their "scratch"/"metal" prefixes.
+_PREVIEW_PRESET_KEYWORDS = {
+    "chrome": "chrome", "mirror": "chrome",
+    "glass": "glass", "window": "glass",
+    "rubber": "rubber", "tire": "rubber", "tyre": "rubber",
+    "scratch": "scratch",
+    "brushed": "brushed",
+    "metal": "metal",
+    "paint": "paint", "coated": "paint",
+    "plastic": "plastic",
+    "gloss": "gloss",
+    "matte": "matte",
+    "satin": "satin",
+}
+# Lookahead so overlapping keywords (e.g. "glassatin") are all found in one pass.
+_RE_PREVIEW_PRESET_KEYWORD = re.compile("(?=(" + "|".join(_PREVIEW_PRESET_KEYWORDS) + "))")
+# No keyword contains "_" or punctuation, so matching per token finds exactly what a whole-name scan would.
+_RE_PREVIEW_PRESET_TOKEN_SEP = re.compile(r"[_\W]+")
 
+# (group, also-required group or None, preset id), first hit wins.
+_PREVIEW_PRESET_PRIORITY = (
     # Explicit / high-priority matches
-    if "chrome" in s or "mirror" in s:
-        return "CHROME"
-    if "glass" in s or "window" in s:
-        return "GLASS"
-    if "rubber" in s or "tire" in s or "tyre" in s:
-        return "RUBBER"
-
+    ("chrome", None, "CHROME"),
+    ("glass", None, "GLASS"),
+    ("rubber", None, "RUBBER"),
     # Common template naming patterns
-    if "scratched" in s or "scratch" in s:
-        return "SCRATCHED_METAL"
-    if "brushed" in s:
-        return "BRUSHED_METAL"
-
+    ("scratch", None, "SCRATCHED_METAL"),
+    ("brushed", None, "BRUSHED_METAL"),
     # Calibrated / generic groups
-    if "metal" in s or "metallic" in s:
-        return "POLISHED_METAL"
-    if "paint" in s or "coated" in s:
-        if "matte" in s:
-            return "MATTE_PAINT"
-        if "satin" in s:
-            return "SATIN_PAINT"
-        return "GLOSS_PAINT"
-    if "plastic" in s:
-        if "matte" in s:
-            return "PLASTIC_MATTE"
-        return "PLASTIC_GLOSS"
-
+    ("metal", None, "POLISHED_METAL"),
+    ("paint", "matte", "MATTE_PAINT"),
+    ("paint", "satin", "SATIN_PAINT"),
+    ("paint", None, "GLOSS_PAINT"),
+    ("plastic", "matte", "PLASTIC_MATTE"),
+    ("plastic", None, "PLASTIC_GLOSS"),
     # Fallback keywords
-    if "gloss" in s:
-        return "GLOSS_PAINT"
-    if "matte" in s:
-        return "MATTE_PAINT"
+    ("gloss", None, "GLOSS_PAINT"),
+    ("matte", None, "MATTE_PAINT"),
+)
+
 
+@functools.lru_cache(maxsize=1024)
+def _preview_preset_token_groups(token: str) -> frozenset:
+    # Template names reuse the same few tokens ("wood1", "painted", "metal"...), so each is scanned once.
+    return frozenset(_PREVIEW_PRESET_KEYWORDS[m.group(1)] for m in _RE_PREVIEW_PRESET_KEYWORD.finditer(token))
+
+
+@functools.lru_cache(maxsize=256)
+def _guess_preview_preset_id(material_template_name: str):
+    if not material_template_name:
+        return None
+
+    s = material_template_name.strip().lower()
+    found = set()
+    for tok in _RE_PREVIEW_PRESET_TOKEN_SEP.split(s):
+        if tok:
+            found |= _preview_preset_token_groups(tok)
+    if not found:
+        return None
+
+    for group, also, preset_id in _PREVIEW_PRESET_PRIORITY:
+        if group in found and (also is None or also in found):
+            return preset_id
     return None
 
 
 def _is_preview_only_node(node) -> bool:
+    if node is None:
+        return False
+    # ID property (node.get covers node["..."] too); a failing read must not skip the label tag.
     try:
-        if node is None:
-            return False
-        # ID properties
-        try:
-            if bool(node.get("i3d_preview_only", False)):
-                return True
-        except Exception:
-            pass
-        try:
-            if bool(node["i3d_preview_only"]):
-                return True
-        except Exception:
-            pass
-        try:
-            lab = getattr(node, "label", "") or ""
-            if lab.startswith("I3D_PREVIEW_ONLY:"):
-                return True
-        except Exception:
-            pass
+        if node.get("i3d_preview_only", False):
+            return True
     except Exception:
         pass
-    return False
+    try:
+        return (getattr(node, "label", "") or "").startswith("I3D_PREVIEW_ONLY:")
+    except Exception:
+        return False
 
 
 
@@ -3073,8 +3593,7 @@ def _is_legacy_orphan_preview_node(node) -> bool:
     try:
         if node is None:
             return False
-        if _is_preview_only_node(node):
-            return False
+        # Cheapest checks first: almost every node is rejected by its type.
         # Only remove completely unlinked Math(Add) nodes with default 0.5/0.5 and no label.
         if getattr(node, "type", "") != 'MATH':
             return False
@@ -3085,12 +3604,14 @@ def _is_legacy_orphan_preview_node(node) -> bool:
             return False
         if (getattr(node, "label", "") or "").strip():
             return False
-        # No links anywhere
+        # No links anywhere (Math has 3 inputs / 1 output, so plain loops beat any() generators)
         try:
-            if any(s.is_linked for s in getattr(node, "inputs", [])):
-                return False
-            if any(s.is_linked for s in getattr(node, "outputs", [])):
-                return False
+            for sock in node.inputs:
+                if sock.is_linked:
+                    return False
+            for sock in node.outputs:
+                if sock.is_linked:
+                    return False
         except Exception:
             pass
         # Default inputs of Blender's Math(Add) are typically 0.5 / 0.5
@@ -3101,11 +3622,72 @@ def _is_legacy_orphan_preview_node(node) -> bool:
                 return False
         except Exception:
             return False
-        return True
+        # Tagged preview nodes are handled by _is_preview_only_node, not as orphans.
+        return not _is_preview_only_node(node)
     except Exception:
         return False
 
 
+def _capture_socket_wiring(inp, coerce=float, fallback=None, *, always_default: bool = False):
+    """Return (linked, from_node, from_socket, default) for a socket a preview is about to rewire.
+
+    The default value is captured only when unlinked unless always_default is set (Base Color /
+    Alpha restores want it either way; those also keep the linked flag if the link can't be read).
+    coerce=None skips the default entirely.
+    """
+    try:
+        linked = bool(inp.is_linked)
+    except Exception:
+        linked = False
+    from_node = ""
+    from_socket = ""
+    if linked:
+        try:
+            lnk = inp.links[0]
+            from_node = lnk.from_node.name
+            from_socket = lnk.from_socket.name
+        except Exception:
+            if not always_default:
+                linked = False
+    default = None
+    if coerce is not None and (always_default or not linked):
+        try:
+            default = coerce(inp.default_value)
+        except Exception:
+            default = fallback
+    return linked, from_node, from_socket, default
+
+
+# Restore records are stored on every preview node, so the ID-property form uses short keys.
+_RESTORE_SHORT_KEYS = {
+    "target_node": "t",
+    "target_socket": "s",
+    "orig_linked": "l",
+    "orig_from_node": "fn",
+    "orig_from_socket": "fs",
+    "orig_default": "d",
+}
+_RESTORE_LONG_KEYS = {v: k for k, v in _RESTORE_SHORT_KEYS.items()}
+
+
+def _restore_idprop(restore: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore record as stored on the node: a compact native ID-property dict.
+
+    None / "" values are omitted (IDProps cannot hold None; readers treat missing as empty).
+    """
+    return {
+        _RESTORE_SHORT_KEYS.get(k, k): (int(v) if isinstance(v, bool) else v)
+        for k, v in restore.items()
+        if v is not None and v != ""
+    }
+
+
+@functools.lru_cache(maxsize=512)
+def _restore_json_loads(restore_json: str) -> Dict[str, Any]:
+    # Records written by older versions are JSON strings. Shared between calls: callers only read it.
+    return json.loads(restore_json)
+
+
 def _tag_preview_node(node, role: str, *, restore: Optional[Dict[str, Any]] = None) -> None:
     if node is None:
         return
@@ -3121,9 +3703,14 @@ def _tag_preview_node(node, role: str, *, restore: Optional[Dict[str, Any]] = No
         node.label = f"I3D_PREVIEW_ONLY:{role}"
     except Exception:
         pass
+    try:
+        # Tree-level marker so clear/strip can skip trees that never got a preview.
+        node.id_data["i3d_has_preview"] = True
+    except Exception:
+        pass
     if restore is not None:
         try:
-            node["i3d_preview_restore"] = json.dumps(restore)
+            node["i3d_preview_restore"] = _restore_idprop(restore)
         except Exception:
             pass
 
@@ -3140,22 +3727,145 @@ def _unlink_input_socket(node_tree: bpy.types.NodeTree, inp: bpy.types.NodeSocke
         pass
 
 
+# normalized absolute filepath -> bpy.data.images name, so repeated applies skip images.load's
+# linear filepath scan. Names (not Image references) are kept; a hit is re-validated against
+# the image's filepath.
+_IMG_CACHE: Dict[str, str] = {}
+
+
+def _image_path_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(bpy.path.abspath(path)))
+
+
+def _seed_image_cache() -> None:
+    """Index every file-backed image already in bpy.data.images (once per apply batch)."""
+    try:
+        for img in bpy.data.images:
+            fp = img.filepath
+            if fp:
+                _IMG_CACHE.setdefault(_image_path_key(fp), img.name)
+    except Exception:
+        pass
+
+
 def _load_image_safe(abs_path: str) -> Optional[bpy.types.Image]:
     p = (abs_path or "").strip()
     if not p:
         return None
+    try:
+        key = _image_path_key(p)
+    except Exception:
+        key = p
+    name = _IMG_CACHE.get(key)
+    if name:
+        try:
+            img = bpy.data.images.get(name)
+            if img is not None and _image_path_key(img.filepath) == key:
+                return img
+        except Exception:
+            pass
+        _IMG_CACHE.pop(key, None)
     try:
         # check_existing keeps memory sane when applying repeatedly
-        return bpy.data.images.load(p, check_existing=True)
+        img = bpy.data.images.load(p, check_existing=True)
     except Exception:
         return None
+    try:
+        _IMG_CACHE[key] = img.name
+    except Exception:
+        pass
+    return img
 
 
-def _new_node_safe(node_tree: bpy.types.NodeTree, node_type: str):
+def _new_node_safe(node_tree: bpy.types.NodeTree, node_type: str, *, loc=None, value=None):
+    """Create a node; optionally place it and set outputs[0].default_value (Value/RGB nodes)."""
     try:
-        return node_tree.nodes.new(type=node_type)
+        n = node_tree.nodes.new(type=node_type)
     except Exception:
         return None
+    if loc is not None or value is not None:
+        try:
+            if loc is not None:
+                n.location = loc
+            if value is not None:
+                n.outputs[0].default_value = value
+        except Exception:
+            pass
+    return n
+
+
+def _new_math_node_safe(node_tree: bpy.types.NodeTree, operation: str, loc, *, in0=None, in1=None):
+    """Create a configured ShaderNodeMath (operation, location, optional input defaults)."""
+    n = _new_node_safe(node_tree, "ShaderNodeMath")
+    if n is None:
+        return None
+    try:
+        n.operation = operation
+        if in0 is not None:
+            n.inputs[0].default_value = in0
+        if in1 is not None:
+            n.inputs[1].default_value = in1
+        n.location = loc
+    except Exception:
+        pass
+    return n
+
+
+def _place_preview_node(node_tree: bpy.types.NodeTree, node_type: str, loc, role: str, *, value=None, restore=None):
+    """Create, place and preview-tag a node in one call (None if creation failed)."""
+    n = _new_node_safe(node_tree, node_type, loc=loc, value=value)
+    if n is not None:
+        _tag_preview_node(n, role, restore=restore)
+    return n
+
+
+def _new_math_nodes_safe(node_tree: bpy.types.NodeTree, specs):
+    """Create a group of Math nodes in one pass from (operation, loc, in0, in1) specs.
+
+    All nodes are created first through a single bound nodes.new, then configured; if any
+    creation fails the partial group is removed and None is returned (no untagged leftovers).
+    """
+    nodes = node_tree.nodes
+    nodes_new = nodes.new
+    created = []
+    try:
+        for _spec in specs:
+            created.append(nodes_new(type="ShaderNodeMath"))
+    except Exception:
+        for n in created:
+            try:
+                nodes.remove(n)
+            except Exception:
+                pass
+        return None
+    for n, (operation, loc, in0, in1) in zip(created, specs):
+        try:
+            n.operation = operation
+            if in0 is not None:
+                n.inputs[0].default_value = in0
+            if in1 is not None:
+                n.inputs[1].default_value = in1
+            n.location = loc
+        except Exception:
+            pass
+    return created
+
+
+def _safe_link(links_new, from_sock, to_sock) -> bool:
+    """links.new with the missing-socket case checked up front; True when the link was made."""
+    if from_sock is None or to_sock is None:
+        return False
+    try:
+        links_new(from_sock, to_sock)
+        return True
+    except Exception:
+        return False
+
+
+def _node_output(nodes_get, node_name: str, socket_name: str):
+    """Output socket `socket_name` of node `node_name`, or None."""
+    src = nodes_get(node_name) if node_name else None
+    return src.outputs.get(socket_name) if src is not None and socket_name else None
 
 
 def _make_image_texture_node(node_tree: bpy.types.NodeTree, abs_path: str, *, non_color: bool, role: str, loc=(0, 0)):
@@ -3257,7 +3967,37 @@ def _configure_detail_preview_teximage_node(tex: bpy.types.Node) -> None:
     except Exception:
         pass
 
-def _apply_material_template_preview_maps(mat: bpy.types.Material, material_template_name: str) -> bool:
+
+# Numeric materialTemplates.xml attributes read by the preview builder, with their defaults.
+_MTPL_NUMERIC_KEYS = ("smoothnessScale", "metalnessScale", "clearCoatIntensity", "clearCoatSmoothness", "porosity")
+_MTPL_NUMERIC_DEFAULTS = (1.0, 1.0, 0.0, 0.0, 0.0)
+# Template names that should not look glossy in Blender previews.
+_RE_DRY_TEMPLATE_NAME = re.compile("fabric|cloth|carpet|rubber|matte|matpaint")
+# Principled socket renamed across Blender versions: candidate names -> the one this Blender uses.
+_BSDF_SOCKET_ALIAS: Dict[Tuple[str, ...], str] = {}
+# (BSDF input name variants, preview role, y offset from the BSDF) for the scalar preview overrides.
+_PREVIEW_COAT_INPUTS = (
+    (("Coat Weight", "Clearcoat", "Clearcoat Weight"), "COAT_WEIGHT", 320),
+    (("Coat Roughness", "Clearcoat Roughness"), "COAT_ROUGHNESS", 280),
+)
+_PREVIEW_DRY_ZERO_INPUTS = (
+    (("Specular IOR Level", "Specular", "Specular Level", "Specular IOR"), "SPECULAR_ZERO", 240),
+    (("IOR",), "IOR_ZERO", 200),
+    (("Coat Weight", "Clearcoat", "Clearcoat Weight"), "COAT_WEIGHT_ZERO", 160),
+)
+# detailDiffuse routing as bit flags; unknown / ROUGHNESS modes map to _DD_OTHER.
+_DD_SKIP = 1
+_DD_ALBEDO = 2
+_DD_ALBEDO_TINT = 4
+_DD_DECAL = 8
+_DD_OTHER = 16
+_DD_MODE_BITS = {"SKIP": _DD_SKIP, "ALBEDO": _DD_ALBEDO, "ALBEDO_TINT": _DD_ALBEDO_TINT, "DECAL": _DD_DECAL}
+# Modes that put detailDiffuse into Base Color / that keep it out of Diffuse Roughness.
+_DD_ALBEDO_MASK = _DD_ALBEDO | _DD_ALBEDO_TINT
+_DD_NO_ROUGHNESS_MASK = _DD_SKIP | _DD_ALBEDO | _DD_ALBEDO_TINT | _DD_DECAL
+
+
+def _apply_material_template_preview_maps(mat: bpy.types.Material, material_template_name: str, override: Optional[_MtplOverride] = None) -> bool:
     """Inject preview detail maps (Diffuse / Specular / Normal) into the active material node tree.
 
     DTAP requirements:
@@ -3267,6 +4007,7 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
     - Do NOT overwrite user textures: combine with existing links/values.
     - Tag all injected nodes so exporter can ignore them.
     - Preview is applied only via Apply-to-Material operators.
+    - `override` defaults to the snapshot set by _mtpl_apply_overrides.
     """
     if not mat or not mat.use_nodes or not mat.node_tree:
         return False
@@ -3303,15 +4044,21 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
 
 
     # Apply-time overrides (set by modal prompts / decal picker).
-    dd_mode = str(_MTPL_OVERRIDE_DETAIL_DIFFUSE_MODE or "").upper().strip()
-    decal_path_override = str(_MTPL_OVERRIDE_DECAL_IMAGE_PATH or "").strip()
-    decal_persist_override = bool(_MTPL_OVERRIDE_DECAL_PERSIST)
-    forced_tint_override = _MTPL_OVERRIDE_FORCED_TINT
-    apply_alpha_override = _MTPL_OVERRIDE_APPLY_ALPHA
+    ov = override if override is not None else _MTPL_OVERRIDE
+    dd_mode = ov.dd_mode
+    decal_path_override = ov.decal_path
+    decal_path_exists = ov.decal_exists
+    decal_persist_override = ov.decal_persist
+    forced_tint_override = ov.forced_tint
+    apply_alpha_override = ov.apply_alpha
 
     nt = mat.node_tree
     nodes = nt.nodes
     links = nt.links
+    # Bound once: these are called dozens of times per material.
+    _links_new = links.new
+    _nodes_new = nodes.new
+    _nodes_get = nodes.get
 
     bx, by = (0.0, 0.0)
     try:
@@ -3324,17 +4071,44 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
 
     applied_any = False
 
-    # Common sockets we may override (Base Color / Alpha).
-    base_color_in = None
-    alpha_in = None
-    try:
-        base_color_in = bsdf.inputs.get("Base Color")
-    except Exception:
-        base_color_in = None
+    # BSDF sockets by name, read once (first socket wins, like inputs.get).
+    inputs_by_name = {}
     try:
-        alpha_in = bsdf.inputs.get("Alpha")
+        for sock in bsdf.inputs:
+            inputs_by_name.setdefault(sock.name, sock)
     except Exception:
-        alpha_in = None
+        pass
+
+    def _bsdf_input(*names):
+        # The matching alias only depends on the running Blender version; remember it per session.
+        hit = _BSDF_SOCKET_ALIAS.get(names)
+        if hit is not None:
+            sock = inputs_by_name.get(hit)
+            if sock is not None:
+                return sock
+        for nm in names:
+            sock = inputs_by_name.get(nm)
+            if sock is not None:
+                _BSDF_SOCKET_ALIAS[names] = nm
+                return sock
+        return None
+
+    bsdf_name = bsdf.name
+
+    def _restore(target_socket, orig_linked, orig_from_node, orig_from_socket, orig_default):
+        """Restore record for _tag_preview_node: how to rewire target_socket when the preview is cleared."""
+        return {
+            "target_node": bsdf_name,
+            "target_socket": target_socket,
+            "orig_linked": bool(orig_linked),
+            "orig_from_node": orig_from_node,
+            "orig_from_socket": orig_from_socket,
+            "orig_default": orig_default,
+        }
+
+    # Common sockets we may override (Base Color / Alpha).
+    base_color_in = inputs_by_name.get("Base Color")
+    alpha_in = inputs_by_name.get("Alpha")
 
     # AUTO routing rules when no explicit prompt override was chosen.
     # - wood1/wood2 are tintable (keep swatch) => keep detailDiffuse in Diffuse Roughness (Base Color stays swatch).
@@ -3362,6 +4136,9 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                     if forced_tint_override is None:
                         forced_tint_override = cs
 
+    dd_bits = _DD_MODE_BITS.get(dd_mode, _DD_OTHER)
+    is_glass = _mtpl_is_glass(material_template_name)
+
     # If decal template and Base Color already has an image, do NOT prompt again.
     # Instead, optionally wire alpha for preview and skip overriding Base Color.
     if _mtpl_is_decal(material_template_name) and (not decal_path_override) and base_color_in is not None:
@@ -3373,39 +4150,13 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                     want_alpha = bool(apply_alpha_override) if apply_alpha_override is not None else True
                     if want_alpha:
                         # capture original alpha
-                        a_linked = bool(alpha_in.is_linked)
-                        a_from_node = ""
-                        a_from_socket = ""
-                        a_default = None
-                        try:
-                            a_default = float(alpha_in.default_value)
-                        except Exception:
-                            a_default = None
-                        if a_linked:
-                            try:
-                                lnk = alpha_in.links[0]
-                                a_from_node = getattr(lnk.from_node, "name", "")
-                                a_from_socket = getattr(lnk.from_socket, "name", "")
-                            except Exception:
-                                pass
-                        rr = _new_node_safe(nt, "ShaderNodeReroute")
+                        a_linked, a_from_node, a_from_socket, a_default = _capture_socket_wiring(alpha_in, always_default=True)
+                        rr = _place_preview_node(nt, "ShaderNodeReroute", (bx - 220, by + 260), "DECAL_ALPHA_REROUTE", restore=_restore(alpha_in.name, a_linked, a_from_node, a_from_socket, a_default))
                         if rr is not None:
-                            try:
-                                rr.location = (bx - 220, by + 260)
-                            except Exception:
-                                pass
-                            _tag_preview_node(rr, "DECAL_ALPHA_REROUTE", restore={
-                                "target_node": bsdf.name,
-                                "target_socket": alpha_in.name,
-                                "orig_linked": bool(a_linked),
-                                "orig_from_node": a_from_node,
-                                "orig_from_socket": a_from_socket,
-                                "orig_default": a_default,
-                            })
                             _unlink_input_socket(nt, alpha_in)
                             try:
-                                links.new(src_node.outputs.get('Alpha'), rr.inputs[0])
-                                links.new(rr.outputs[0], alpha_in)
+                                _links_new(src_node.outputs.get('Alpha'), rr.inputs[0])
+                                _links_new(rr.outputs[0], alpha_in)
                             except Exception:
                                 pass
                             # set blend/shadow methods for decal preview
@@ -3424,31 +4175,14 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
     if decal_path_override and base_color_in is not None:
         try:
             dp = decal_path_override
-            if os.path.isfile(dp):
+            if decal_path_exists:
                 # capture original Base Color wiring/default
-                orig_linked = bool(base_color_in.is_linked)
-                orig_from_node = ""
-                orig_from_socket = ""
-                orig_default = None
-                try:
-                    orig_default = tuple(base_color_in.default_value)
-                except Exception:
-                    orig_default = None
-                if orig_linked and base_color_in.links:
-                    try:
-                        lnk = base_color_in.links[0]
-                        orig_from_node = getattr(lnk.from_node, "name", "")
-                        orig_from_socket = getattr(lnk.from_socket, "name", "")
-                    except Exception:
-                        pass
+                orig_linked, orig_from_node, orig_from_socket, orig_default = _capture_socket_wiring(base_color_in, coerce=tuple, always_default=True)
 
-                img = nodes.new('ShaderNodeTexImage')
+                img = _nodes_new('ShaderNodeTexImage')
+                img.location = (bx - 420, by + 260)
                 try:
-                    img.location = (bx - 420, by + 260)
-                except Exception:
-                    pass
-                try:
-                    img.image = bpy.data.images.load(dp, check_existing=True)
+                    img.image = _load_image_safe(dp)
                 except Exception:
                     img.image = None
                 try:
@@ -3460,25 +4194,13 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                 except Exception:
                     pass
 
-                # Link color -> Base Color
+                # Link color -> Base Color (links.new replaces the existing single-input link)
                 try:
-                    if orig_linked and base_color_in.links:
-                        try:
-                            links.remove(base_color_in.links[0])
-                        except Exception:
-                            pass
-                    links.new(img.outputs.get('Color'), base_color_in)
+                    _links_new(img.outputs.get('Color'), base_color_in)
                 except Exception:
                     pass
 
-                _tag_preview_node(img, "DECAL_BASECOLOR", restore={
-                    "target_node": bsdf.name,
-                    "target_socket": base_color_in.name,
-                    "orig_linked": bool(orig_linked),
-                    "orig_from_node": orig_from_node,
-                    "orig_from_socket": orig_from_socket,
-                    "orig_default": orig_default,
-                })
+                _tag_preview_node(img, "DECAL_BASECOLOR", restore=_restore(base_color_in.name, orig_linked, orig_from_node, orig_from_socket, orig_default))
                 # Mark persist if requested so Clear Preview does not delete it.
                 if decal_persist_override:
                     try:
@@ -3489,33 +4211,14 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                 # Alpha preview
                 want_alpha = bool(apply_alpha_override) if apply_alpha_override is not None else _mtpl_name_uses_alpha(material_template_name)
                 if want_alpha and alpha_in is not None:
-                    a_linked = bool(alpha_in.is_linked)
-                    a_from_node = ""
-                    a_from_socket = ""
-                    a_default = None
-                    try:
-                        a_default = float(alpha_in.default_value)
-                    except Exception:
-                        a_default = None
-                    if a_linked and alpha_in.links:
-                        try:
-                            lnk = alpha_in.links[0]
-                            a_from_node = getattr(lnk.from_node, "name", "")
-                            a_from_socket = getattr(lnk.from_socket, "name", "")
-                        except Exception:
-                            pass
+                    a_linked, a_from_node, a_from_socket, a_default = _capture_socket_wiring(alpha_in, always_default=True)
                     try:
-                        if a_linked and alpha_in.links:
-                            try:
-                                links.remove(alpha_in.links[0])
-                            except Exception:
-                                pass
-                        links.new(img.outputs.get('Alpha'), alpha_in)
+                        _links_new(img.outputs.get('Alpha'), alpha_in)
                     except Exception:
                         pass
                     _store_preview_methods(mat)
                     try:
-                        if _mtpl_is_glass(material_template_name):
+                        if is_glass:
                             mat.blend_method = 'BLEND'
                             mat.shadow_method = 'HASHED'
                         else:
@@ -3524,14 +4227,7 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                     except Exception:
                         pass
                     try:
-                        img["i3d_preview_restore_alpha"] = json.dumps({
-                            "target_node": bsdf.name,
-                            "target_socket": alpha_in.name,
-                            "orig_linked": bool(a_linked),
-                            "orig_from_node": a_from_node,
-                            "orig_from_socket": a_from_socket,
-                            "orig_default": a_default,
-                        })
+                        img["i3d_preview_restore_alpha"] = _restore_idprop(_restore(alpha_in.name, a_linked, a_from_node, a_from_socket, a_default))
                     except Exception:
                         pass
                 applied_any = True
@@ -3543,7 +4239,7 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
     # For Blender TEMP preview we simulate see-through by driving Principled Alpha
     # with a constant and switching material blend/shadow methods.
     # ---------------------------------------------------------------------
-    if _mtpl_is_glass(material_template_name) and alpha_in is not None:
+    if is_glass and alpha_in is not None:
         want_alpha = bool(apply_alpha_override) if apply_alpha_override is not None else True
         if want_alpha:
             try:
@@ -3560,118 +4256,66 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                 except Exception:
                     a_default = None
 
-                val = nodes.new("ShaderNodeValue")
-                try:
-                    val.location = (bx - 420, by + 520)
-                except Exception:
-                    pass
-                try:
-                    val.outputs[0].default_value = 0.25
-                except Exception:
-                    pass
+                val = _new_node_safe(nt, "ShaderNodeValue", loc=(bx - 420, by + 520), value=0.25)
+                if val is not None:
+                    try:
+                        _links_new(val.outputs[0], alpha_in)
+                    except Exception:
+                        pass
 
-                try:
-                    links.new(val.outputs[0], alpha_in)
-                except Exception:
-                    pass
+                    _tag_preview_node(val, "GLASS_ALPHA_VALUE", restore=_restore(alpha_in.name, False, a_from_node, a_from_socket, a_default))
 
-                _tag_preview_node(val, "GLASS_ALPHA_VALUE", restore={
-                    "target_node": bsdf.name,
-                    "target_socket": alpha_in.name,
-                    "orig_linked": False,
-                    "orig_from_node": a_from_node,
-                    "orig_from_socket": a_from_socket,
-                    "orig_default": a_default,
-                })
-
-                _store_preview_methods(mat)
-                try:
-                    mat.blend_method = "BLEND"
-                    mat.shadow_method = "HASHED"
-                except Exception:
-                    pass
+                    _store_preview_methods(mat)
+                    try:
+                        mat.blend_method = "BLEND"
+                        mat.shadow_method = "HASHED"
+                    except Exception:
+                        pass
 
-                applied_any = True
+                    applied_any = True
 
-    def _entry_float(key: str, default: float) -> float:
-        try:
-            v = entry.get(key, "")
-            return float(v) if str(v).strip() != "" else float(default)
-        except Exception:
-            return float(default)
+    vals = list(_MTPL_NUMERIC_DEFAULTS)
+    for i, key in enumerate(_MTPL_NUMERIC_KEYS):
+        v = entry.get(key)
+        if v:
+            try:
+                vals[i] = float(v)
+            except (TypeError, ValueError):
+                pass
+    smooth_scale, metal_scale, coat_intensity, coat_smoothness, porosity = vals
 
-    smooth_scale = max(0.0, _entry_float("smoothnessScale", 1.0))
-    metal_scale = max(0.0, _entry_float("metalnessScale", 1.0))
-    coat_intensity = _clamp01(_entry_float("clearCoatIntensity", 0.0))
-    coat_smoothness = _clamp01(_entry_float("clearCoatSmoothness", 0.0))
-    porosity = _clamp01(_entry_float("porosity", 0.0))
+    smooth_scale = max(0.0, smooth_scale)
+    metal_scale = max(0.0, metal_scale)
+    # Clamped inline (once); every derived value below stays in [0, 1] without re-clamping.
+    coat_intensity = 0.0 if coat_intensity < 0.0 else 1.0 if coat_intensity > 1.0 else coat_intensity
+    coat_smoothness = 0.0 if coat_smoothness < 0.0 else 1.0 if coat_smoothness > 1.0 else coat_smoothness
+    porosity = 0.0 if porosity < 0.0 else 1.0 if porosity > 1.0 else porosity
 
     sname = (mt or "").lower()
     # "Dry" heuristic: things that should not look glossy in Blender previews.
     is_dry = (
-        ("fabric" in sname) or ("cloth" in sname) or ("carpet" in sname) or ("rubber" in sname) or
-        ("matte" in sname) or ("matpaint" in sname) or
+        (_RE_DRY_TEMPLATE_NAME.search(sname) is not None) or
         (porosity >= 0.5) or
         (smooth_scale <= 0.25 and metal_scale <= 0.01)
     )
 
     def _connect_preview_value(input_names, value: float, role: str, loc=(0, 0)) -> bool:
         """Connect a preview-only Value node into a BSDF input, preserving/restoring the original."""
-        inp = None
-        for nm in input_names:
-            try:
-                inp = bsdf.inputs.get(nm)
-            except Exception:
-                inp = None
-            if inp is not None:
-                break
+        inp = _bsdf_input(*input_names)
         if inp is None:
             return False
 
-        orig_linked = bool(getattr(inp, "is_linked", False))
-        orig_from_node = ""
-        orig_from_socket = ""
-        orig_default = None
+        orig_linked, orig_from_node, orig_from_socket, orig_default = _capture_socket_wiring(inp)
 
-        if orig_linked:
-            try:
-                lnk = inp.links[0]
-                orig_from_node = lnk.from_node.name
-                orig_from_socket = lnk.from_socket.name
-            except Exception:
-                orig_linked = False
-
-        if not orig_linked:
-            try:
-                orig_default = float(inp.default_value)
-            except Exception:
-                orig_default = None
-
-        valn = _new_node_safe(nt, "ShaderNodeValue")
+        valn = _new_node_safe(nt, "ShaderNodeValue", loc=loc, value=float(value))
         if valn is None:
             return False
 
-        try:
-            valn.location = loc
-        except Exception:
-            pass
-        try:
-            valn.outputs[0].default_value = float(value)
-        except Exception:
-            pass
+        _tag_preview_node(valn, role, restore=_restore(inp.name, orig_linked, orig_from_node, orig_from_socket, orig_default))
 
-        _tag_preview_node(valn, role, restore={
-            "target_node": bsdf.name,
-            "target_socket": inp.name,
-            "orig_linked": bool(orig_linked),
-            "orig_from_node": orig_from_node,
-            "orig_from_socket": orig_from_socket,
-            "orig_default": orig_default,
-        })
-
-        _unlink_input_socket(nt, inp)
+        # links.new replaces whatever currently drives the (single-input) socket.
         try:
-            links.new(valn.outputs[0], inp)
+            _links_new(valn.outputs[0], inp)
             return True
         except Exception:
             return False
@@ -3679,61 +4323,34 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
     # Apply coat scalars (if present) for non-dry templates.
     if not is_dry:
         if coat_intensity > 0.0:
-            if _connect_preview_value(["Coat Weight", "Clearcoat", "Clearcoat Weight"], coat_intensity, "COAT_WEIGHT", loc=(bx - 320, by + 320)):
-                applied_any = True
             # coat smoothness -> coat roughness
-            coat_rough = _clamp01(1.0 - coat_smoothness)
-            if _connect_preview_value(["Coat Roughness", "Clearcoat Roughness"], coat_rough, "COAT_ROUGHNESS", loc=(bx - 320, by + 280)):
-                applied_any = True
+            coat_values = (coat_intensity, 1.0 - coat_smoothness)
+            for (names, role, dy), value in zip(_PREVIEW_COAT_INPUTS, coat_values):
+                if _connect_preview_value(names, value, role, loc=(bx - 320, by + dy)):
+                    applied_any = True
     else:
         # Force specular/ior/coat down for dry templates (fabric/matte/rubber/etc).
-        if _connect_preview_value(["Specular IOR Level", "Specular", "Specular Level", "Specular IOR"], 0.0, "SPECULAR_ZERO", loc=(bx - 320, by + 240)):
-            applied_any = True
-        if _connect_preview_value(["IOR"], 0.0, "IOR_ZERO", loc=(bx - 320, by + 200)):
-            applied_any = True
-        if _connect_preview_value(["Coat Weight", "Clearcoat", "Clearcoat Weight"], 0.0, "COAT_WEIGHT_ZERO", loc=(bx - 320, by + 160)):
-            applied_any = True
+        for names, role, dy in _PREVIEW_DRY_ZERO_INPUTS:
+            if _connect_preview_value(names, 0.0, role, loc=(bx - 320, by + dy)):
+                applied_any = True
 
     # ---------------------------------------------------------------------
     # Diffuse Roughness: plug detailDiffuse into Diffuse Roughness so Base Color remains user-selectable
     # ---------------------------------------------------------------------
     detail_diffuse = (entry.get("detailDiffuse") or "").strip()
-    diffuse_rough_in = None
-    for _nm in ("Diffuse Roughness", "Diffuse roughness", "DiffuseRoughness"):
-        try:
-            diffuse_rough_in = bsdf.inputs.get(_nm)
-        except Exception:
-            diffuse_rough_in = None
-        if diffuse_rough_in is not None:
-            break
+    has_detail_diffuse = bool(detail_diffuse) and _isfile_cached(detail_diffuse, ov.isfile_cache)
+    diffuse_rough_in = _bsdf_input("Diffuse Roughness", "Diffuse roughness", "DiffuseRoughness")
 
     # Override: use detailDiffuse as the albedo (Base Color) instead of affecting Diffuse Roughness.
     # Used when user chooses "Prioritize Detail" for Permanent apply.
-    if dd_mode in ("ALBEDO", "ALBEDO_TINT") and detail_diffuse and os.path.isfile(detail_diffuse) and base_color_in is not None:
+    if has_detail_diffuse and dd_bits & _DD_ALBEDO_MASK and base_color_in is not None:
         # Capture original Base Color wiring/default
-        orig_linked = bool(base_color_in.is_linked)
-        orig_from_node = ""
-        orig_from_socket = ""
-        orig_default = None
-        try:
-            orig_default = tuple(base_color_in.default_value)
-        except Exception:
-            orig_default = None
-        if orig_linked:
-            try:
-                lnk = base_color_in.links[0]
-                orig_from_node = getattr(lnk.from_node, "name", "")
-                orig_from_socket = getattr(lnk.from_socket, "name", "")
-            except Exception:
-                pass
+        orig_linked, orig_from_node, orig_from_socket, orig_default = _capture_socket_wiring(base_color_in, coerce=tuple, always_default=True)
 
-        img = nodes.new('ShaderNodeTexImage')
+        img = _nodes_new('ShaderNodeTexImage')
+        img.location = (bx - 420, by + 340)
         try:
-            img.location = (bx - 420, by + 340)
-        except Exception:
-            pass
-        try:
-            img.image = bpy.data.images.load(detail_diffuse, check_existing=True)
+            img.image = _load_image_safe(detail_diffuse)
         except Exception:
             img.image = None
         try:
@@ -3748,28 +4365,27 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
         # Apply detail UV transform (preview-only)
         try:
             if detail_uv_out is not None and "Vector" in img.inputs:
-                links.new(detail_uv_out, img.inputs["Vector"])
+                _links_new(detail_uv_out, img.inputs["Vector"])
         except Exception:
             pass
 
         out_color = img.outputs.get('Color')
         last_out = out_color
-        if dd_mode == "ALBEDO_TINT":
+        if dd_bits & _DD_ALBEDO_TINT:
             # Multiply by forced tint if provided, else by current Base Color default.
             tint = forced_tint_override
             if tint is None:
                 try:
-                    tint = tuple(bsdf.inputs.get("Base Color").default_value)[:3]
+                    # orig_default already holds the Base Color captured above; no second RNA read.
+                    bc = orig_default if orig_default is not None else base_color_in.default_value
+                    tint = (bc[0], bc[1], bc[2])
                 except Exception:
                     tint = None
             if tint is not None:
-                rgb = nodes.new('ShaderNodeRGB')
-                mul = nodes.new('ShaderNodeMixRGB')
-                try:
-                    rgb.location = (bx - 640, by + 340)
-                    mul.location = (bx - 220, by + 340)
-                except Exception:
-                    pass
+                rgb = _nodes_new('ShaderNodeRGB')
+                mul = _nodes_new('ShaderNodeMixRGB')
+                rgb.location = (bx - 640, by + 340)
+                mul.location = (bx - 220, by + 340)
                 try:
                     rgb.outputs[0].default_value = (float(tint[0]), float(tint[1]), float(tint[2]), 1.0)
                 except Exception:
@@ -3780,8 +4396,8 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                 except Exception:
                     pass
                 try:
-                    links.new(out_color, mul.inputs[1])
-                    links.new(rgb.outputs[0], mul.inputs[2])
+                    _links_new(out_color, mul.inputs[1])
+                    _links_new(rgb.outputs[0], mul.inputs[2])
                     last_out = mul.outputs.get('Color')
                 except Exception:
                     last_out = out_color
@@ -3789,44 +4405,15 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                 _tag_preview_node(mul, "ALBEDO_TINT_MULTIPLY")
 
         try:
-            if orig_linked:
-                try:
-                    links.remove(base_color_in.links[0])
-                except Exception:
-                    pass
-            links.new(last_out, base_color_in)
+            _links_new(last_out, base_color_in)
         except Exception:
             pass
-        _tag_preview_node(img, "DETAIL_DIFFUSE_ALBEDO", restore={
-            "target_node": bsdf.name,
-            "target_socket": base_color_in.name,
-            "orig_linked": bool(orig_linked),
-            "orig_from_node": orig_from_node,
-            "orig_from_socket": orig_from_socket,
-            "orig_default": orig_default,
-        })
+        _tag_preview_node(img, "DETAIL_DIFFUSE_ALBEDO", restore=_restore(base_color_in.name, orig_linked, orig_from_node, orig_from_socket, orig_default))
         applied_any = True
 
-    if dd_mode not in ("SKIP", "ALBEDO", "ALBEDO_TINT", "DECAL") and detail_diffuse and os.path.isfile(detail_diffuse) and diffuse_rough_in is not None:
+    if has_detail_diffuse and not (dd_bits & _DD_NO_ROUGHNESS_MASK) and diffuse_rough_in is not None:
         # Capture original
-        orig_linked = bool(diffuse_rough_in.is_linked)
-        orig_from_node = ""
-        orig_from_socket = ""
-        orig_default = None
-
-        if orig_linked:
-            try:
-                lnk = diffuse_rough_in.links[0]
-                orig_from_node = lnk.from_node.name
-                orig_from_socket = lnk.from_socket.name
-            except Exception:
-                orig_linked = False
-
-        if not orig_linked:
-            try:
-                orig_default = float(diffuse_rough_in.default_value)
-            except Exception:
-                orig_default = 0.0
+        orig_linked, orig_from_node, orig_from_socket, orig_default = _capture_socket_wiring(diffuse_rough_in, fallback=0.0)
 
         tex = _make_image_texture_node(nt, detail_diffuse, non_color=True, role="DETAIL_DIFFUSE", loc=(bx - 520, by + 140))
         if tex is not None:
@@ -3835,53 +4422,30 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
             except Exception:
                 pass
             # Apply detail UV transform (preview-only)
-            try:
-                if detail_uv_out is not None and "Vector" in tex.inputs:
-                    links.new(detail_uv_out, tex.inputs["Vector"])
-            except Exception:
-                pass
-            bw = _new_node_safe(nt, "ShaderNodeRGBToBW")
-            mul = _new_node_safe(nt, "ShaderNodeMath")
+            _safe_link(_links_new, detail_uv_out, tex.inputs.get("Vector"))
+            bw = _new_node_safe(nt, "ShaderNodeRGBToBW", loc=(bx - 320, by + 140))
+            mul = _new_math_node_safe(nt, 'MULTIPLY', (bx - 120, by + 140))
             if bw and mul:
-                try:
-                    bw.location = (bx - 320, by + 140)
-                    mul.location = (bx - 120, by + 140)
-                    mul.operation = 'MULTIPLY'
-                except Exception:
-                    pass
-
                 _tag_preview_node(bw, "DIFFUSE_BW")
-                _tag_preview_node(mul, "DIFFUSE_ROUGH_MULTIPLY", restore={
-                    "target_node": bsdf.name,
-                    "target_socket": diffuse_rough_in.name,
-                    "orig_linked": bool(orig_linked),
-                    "orig_from_node": orig_from_node,
-                    "orig_from_socket": orig_from_socket,
-                    "orig_default": orig_default,
-                })
+                _tag_preview_node(mul, "DIFFUSE_ROUGH_MULTIPLY", restore=_restore(diffuse_rough_in.name, orig_linked, orig_from_node, orig_from_socket, orig_default))
 
                 _unlink_input_socket(nt, diffuse_rough_in)
 
                 if orig_linked and orig_from_node and orig_from_socket:
                     try:
-                        src_node = nodes.get(orig_from_node)
+                        src_node = _nodes_get(orig_from_node)
                         src_sock = src_node.outputs.get(orig_from_socket) if src_node else None
                         if src_sock:
-                            bw_orig = _new_node_safe(nt, "ShaderNodeRGBToBW")
+                            bw_orig = _place_preview_node(nt, "ShaderNodeRGBToBW", (bx - 320, by + 20), "DIFFROUGH_ORIG_BW")
                             if bw_orig is not None:
                                 try:
-                                    bw_orig.location = (bx - 320, by + 20)
-                                except Exception:
-                                    pass
-                                _tag_preview_node(bw_orig, "DIFFROUGH_ORIG_BW")
-                                try:
-                                    links.new(src_sock, bw_orig.inputs["Color"])
-                                    links.new(bw_orig.outputs["Val"], mul.inputs[0])
+                                    _links_new(src_sock, bw_orig.inputs["Color"])
+                                    _links_new(bw_orig.outputs["Val"], mul.inputs[0])
                                 except Exception:
                                     pass
                             else:
                                 try:
-                                    links.new(src_sock, mul.inputs[0])
+                                    _links_new(src_sock, mul.inputs[0])
                                 except Exception:
                                     pass
                     except Exception:
@@ -3893,27 +4457,21 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                             base_val = float(orig_default)
                     except Exception:
                         base_val = 1.0
-                    val = _new_node_safe(nt, "ShaderNodeValue")
+                    val = _place_preview_node(nt, "ShaderNodeValue", (bx - 520, by + 20), "DIFFROUGH_ORIGINAL_VALUE", value=float(base_val))
                     if val is not None:
                         try:
-                            val.location = (bx - 520, by + 20)
-                            val.outputs[0].default_value = float(base_val)
-                        except Exception:
-                            pass
-                        _tag_preview_node(val, "DIFFROUGH_ORIGINAL_VALUE")
-                        try:
-                            links.new(val.outputs[0], mul.inputs[0])
+                            _links_new(val.outputs[0], mul.inputs[0])
                         except Exception:
                             pass
 
                 try:
-                    links.new(tex.outputs["Color"], bw.inputs["Color"])
-                    links.new(bw.outputs["Val"], mul.inputs[1])
+                    _links_new(tex.outputs["Color"], bw.inputs["Color"])
+                    _links_new(bw.outputs["Val"], mul.inputs[1])
                 except Exception:
                     pass
 
                 try:
-                    links.new(mul.outputs["Value"], diffuse_rough_in)
+                    _links_new(mul.outputs["Value"], diffuse_rough_in)
                     applied_any = True
                 except Exception:
                     pass
@@ -3924,17 +4482,9 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
     #   detailSpecular.b - metalness   => metallic = max(original, metalness * metalnessScale)
     # ---------------------------------------------------------------------
     detail_spec = (entry.get("detailSpecular") or "").strip()
-    if detail_spec and os.path.isfile(detail_spec):
-        rough_in = None
-        metal_in = None
-        try:
-            rough_in = bsdf.inputs.get("Roughness")
-        except Exception:
-            rough_in = None
-        try:
-            metal_in = bsdf.inputs.get("Metallic")
-        except Exception:
-            metal_in = None
+    if detail_spec and _isfile_cached(detail_spec, ov.isfile_cache):
+        rough_in = inputs_by_name.get("Roughness")
+        metal_in = inputs_by_name.get("Metallic")
 
         tex = _make_image_texture_node(nt, detail_spec, non_color=True, role="DETAIL_SPECULAR", loc=(bx - 520, by - 220))
         if tex is not None:
@@ -3943,20 +4493,11 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
             except Exception:
                 pass
             # Apply detail UV transform (preview-only)
-            try:
-                if detail_uv_out is not None and "Vector" in tex.inputs:
-                    links.new(detail_uv_out, tex.inputs["Vector"])
-            except Exception:
-                pass
-            sep = _new_node_safe(nt, "ShaderNodeSeparateRGB")
+            _safe_link(_links_new, detail_uv_out, tex.inputs.get("Vector"))
+            sep = _place_preview_node(nt, "ShaderNodeSeparateRGB", (bx - 320, by - 220), "SPEC_SEPARATE_RGB")
             if sep is not None:
                 try:
-                    sep.location = (bx - 320, by - 220)
-                except Exception:
-                    pass
-                _tag_preview_node(sep, "SPEC_SEPARATE_RGB")
-                try:
-                    links.new(tex.outputs["Color"], sep.inputs["Image"])
+                    _links_new(tex.outputs["Color"], sep.inputs["Image"])
                 except Exception:
                     pass
 
@@ -3964,52 +4505,21 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
             # Roughness output
             # -----------------------------
             if rough_in is not None:
-                orig_linked = bool(rough_in.is_linked)
-                orig_from_node = ""
-                orig_from_socket = ""
-                orig_default = None
-
-                if orig_linked:
-                    try:
-                        lnk = rough_in.links[0]
-                        orig_from_node = lnk.from_node.name
-                        orig_from_socket = lnk.from_socket.name
-                    except Exception:
-                        orig_linked = False
-
-                if not orig_linked:
-                    try:
-                        orig_default = float(rough_in.default_value)
-                    except Exception:
-                        orig_default = 0.5
+                orig_linked, orig_from_node, orig_from_socket, orig_default = _capture_socket_wiring(rough_in, fallback=0.5)
+                # One record for whichever node ends up driving Roughness (read-only, safe to share).
+                rough_restore = _restore("Roughness", orig_linked, orig_from_node, orig_from_socket, orig_default)
 
                 # smooth_scaled = smoothness * smoothnessScale
-                smooth_mul = _new_node_safe(nt, "ShaderNodeMath")
-                inv_smooth = _new_node_safe(nt, "ShaderNodeMath")  # 1 - smooth_scaled
-                mul = _new_node_safe(nt, "ShaderNodeMath")         # orig * (1 - smooth_scaled)
-
-                if smooth_mul is not None and inv_smooth is not None and mul is not None:
-                    try:
-                        smooth_mul.operation = 'MULTIPLY'
-                        smooth_mul.inputs[1].default_value = float(smooth_scale)
-                        smooth_mul.location = (bx - 120, by - 180)
-                    except Exception:
-                        pass
+                math_nodes = _new_math_nodes_safe(nt, (
+                    ('MULTIPLY', (bx - 120, by - 180), None, float(smooth_scale)),  # smooth_scaled
+                    ('SUBTRACT', (bx + 60, by - 220), 1.0, None),  # 1 - smooth_scaled
+                    ('MULTIPLY', (bx + 240, by - 220), None, None),  # orig * (1 - smooth_scaled)
+                ))
+
+                if math_nodes is not None:
+                    smooth_mul, inv_smooth, mul = math_nodes
                     _tag_preview_node(smooth_mul, "SMOOTHNESS_SCALE")
-
-                    try:
-                        inv_smooth.operation = 'SUBTRACT'
-                        inv_smooth.inputs[0].default_value = 1.0
-                        inv_smooth.location = (bx + 60, by - 220)
-                    except Exception:
-                        pass
                     _tag_preview_node(inv_smooth, "ROUGH_FROM_SMOOTHNESS")
-
-                    try:
-                        mul.operation = 'MULTIPLY'
-                        mul.location = (bx + 240, by - 220)
-                    except Exception:
-                        pass
                     _tag_preview_node(mul, "ROUGHNESS_MULTIPLY")
 
                     _unlink_input_socket(nt, rough_in)
@@ -4017,124 +4527,75 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                     # Connect smoothness -> smooth_mul
                     try:
                         if sep is not None:
-                            links.new(sep.outputs["R"], smooth_mul.inputs[0])
+                            _links_new(sep.outputs["R"], smooth_mul.inputs[0])
                         else:
-                            bw = _new_node_safe(nt, "ShaderNodeRGBToBW")
+                            bw = _place_preview_node(nt, "ShaderNodeRGBToBW", (bx - 320, by - 220), "SPEC_BW_FALLBACK")
                             if bw is not None:
-                                try:
-                                    bw.location = (bx - 320, by - 220)
-                                except Exception:
-                                    pass
-                                _tag_preview_node(bw, "SPEC_BW_FALLBACK")
-                                links.new(tex.outputs["Color"], bw.inputs["Color"])
-                                links.new(bw.outputs["Val"], smooth_mul.inputs[0])
+                                _links_new(tex.outputs["Color"], bw.inputs["Color"])
+                                _links_new(bw.outputs["Val"], smooth_mul.inputs[0])
                     except Exception:
                         pass
 
                     # Original roughness source
                     if orig_linked and orig_from_node and orig_from_socket:
                         try:
-                            src_node = nodes.get(orig_from_node)
+                            src_node = _nodes_get(orig_from_node)
                             src_sock = src_node.outputs.get(orig_from_socket) if src_node else None
                             if src_sock:
-                                bw_orig = _new_node_safe(nt, "ShaderNodeRGBToBW")
+                                bw_orig = _place_preview_node(nt, "ShaderNodeRGBToBW", (bx - 320, by - 320), "ROUGH_ORIG_BW")
                                 if bw_orig is not None:
-                                    try:
-                                        bw_orig.location = (bx - 320, by - 320)
-                                    except Exception:
-                                        pass
-                                    _tag_preview_node(bw_orig, "ROUGH_ORIG_BW")
-                                    links.new(src_sock, bw_orig.inputs["Color"])
-                                    links.new(bw_orig.outputs["Val"], mul.inputs[0])
+                                    _links_new(src_sock, bw_orig.inputs["Color"])
+                                    _links_new(bw_orig.outputs["Val"], mul.inputs[0])
                                 else:
-                                    links.new(src_sock, mul.inputs[0])
+                                    _links_new(src_sock, mul.inputs[0])
                         except Exception:
                             pass
                     else:
-                        val = _new_node_safe(nt, "ShaderNodeValue")
+                        val = _place_preview_node(nt, "ShaderNodeValue", (bx - 320, by - 320), "ROUGH_ORIG_VALUE", value=1.0)
                         if val is not None:
                             try:
-                                val.location = (bx - 320, by - 320)
-                                val.outputs[0].default_value = 1.0
-                            except Exception:
-                                pass
-                            _tag_preview_node(val, "ROUGH_ORIG_VALUE")
-                            try:
-                                links.new(val.outputs[0], mul.inputs[0])
+                                _links_new(val.outputs[0], mul.inputs[0])
                             except Exception:
                                 pass
 
                     # smooth_mul -> inv_smooth -> mul
                     try:
-                        links.new(smooth_mul.outputs[0], inv_smooth.inputs[1])
-                        links.new(inv_smooth.outputs[0], mul.inputs[1])
+                        _links_new(smooth_mul.outputs[0], inv_smooth.inputs[1])
+                        _links_new(inv_smooth.outputs[0], mul.inputs[1])
                     except Exception:
                         pass
 
                     # Porosity makes materials appear less glossy in GE; approximate by flooring roughness.
                     if porosity > 0.0:
-                        rough_floor = _clamp01(porosity * 0.8)
-                        mx = _new_node_safe(nt, "ShaderNodeMath")
+                        rough_floor = porosity * 0.8
+                        mx = _new_math_node_safe(nt, 'MAXIMUM', (bx + 420, by - 220))
                         if mx is not None:
-                            try:
-                                mx.operation = 'MAXIMUM'
-                                mx.location = (bx + 420, by - 220)
-                            except Exception:
-                                pass
-                            _tag_preview_node(mx, "ROUGHNESS_POROSITY_MAX", restore={
-                                "target_node": bsdf.name,
-                                "target_socket": "Roughness",
-                                "orig_linked": bool(orig_linked),
-                                "orig_from_node": orig_from_node,
-                                "orig_from_socket": orig_from_socket,
-                                "orig_default": orig_default,
-                            })
+                            _tag_preview_node(mx, "ROUGHNESS_POROSITY_MAX", restore=rough_restore)
 
-                            valfloor = _new_node_safe(nt, "ShaderNodeValue")
-                            if valfloor is not None:
-                                try:
-                                    valfloor.location = (bx + 240, by - 300)
-                                    valfloor.outputs[0].default_value = float(rough_floor)
-                                except Exception:
-                                    pass
-                                _tag_preview_node(valfloor, "ROUGHNESS_POROSITY_FLOOR")
+                            valfloor = _place_preview_node(nt, "ShaderNodeValue", (bx + 240, by - 300), "ROUGHNESS_POROSITY_FLOOR", value=float(rough_floor))
 
                             try:
-                                links.new(mul.outputs[0], mx.inputs[0])
+                                _links_new(mul.outputs[0], mx.inputs[0])
                                 if valfloor is not None:
-                                    links.new(valfloor.outputs[0], mx.inputs[1])
+                                    _links_new(valfloor.outputs[0], mx.inputs[1])
                                 else:
                                     mx.inputs[1].default_value = float(rough_floor)
-                                links.new(mx.outputs[0], rough_in)
+                                _links_new(mx.outputs[0], rough_in)
                                 applied_any = True
                             except Exception:
                                 pass
                         else:
                             # fallback: no porosity floor node
-                            _tag_preview_node(mul, "ROUGHNESS_MULTIPLY", restore={
-                                "target_node": bsdf.name,
-                                "target_socket": "Roughness",
-                                "orig_linked": bool(orig_linked),
-                                "orig_from_node": orig_from_node,
-                                "orig_from_socket": orig_from_socket,
-                                "orig_default": orig_default,
-                            })
+                            _tag_preview_node(mul, "ROUGHNESS_MULTIPLY", restore=rough_restore)
                             try:
-                                links.new(mul.outputs[0], rough_in)
+                                _links_new(mul.outputs[0], rough_in)
                                 applied_any = True
                             except Exception:
                                 pass
                     else:
-                        _tag_preview_node(mul, "ROUGHNESS_MULTIPLY", restore={
-                            "target_node": bsdf.name,
-                            "target_socket": "Roughness",
-                            "orig_linked": bool(orig_linked),
-                            "orig_from_node": orig_from_node,
-                            "orig_from_socket": orig_from_socket,
-                            "orig_default": orig_default,
-                        })
+                        _tag_preview_node(mul, "ROUGHNESS_MULTIPLY", restore=rough_restore)
                         try:
-                            links.new(mul.outputs[0], rough_in)
+                            _links_new(mul.outputs[0], rough_in)
                             applied_any = True
                         except Exception:
                             pass
@@ -4143,127 +4604,56 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
             # Metallic output
             # -----------------------------
             if metal_in is not None:
-                orig_linked = bool(metal_in.is_linked)
-                orig_from_node = ""
-                orig_from_socket = ""
-                orig_default = None
-
-                if orig_linked:
-                    try:
-                        lnk = metal_in.links[0]
-                        orig_from_node = lnk.from_node.name
-                        orig_from_socket = lnk.from_socket.name
-                    except Exception:
-                        orig_linked = False
-
-                if not orig_linked:
-                    try:
-                        orig_default = float(metal_in.default_value)
-                    except Exception:
-                        orig_default = 0.0
+                orig_linked, orig_from_node, orig_from_socket, orig_default = _capture_socket_wiring(metal_in, fallback=0.0)
 
                 # metal_scaled = metalness * metalnessScale
-                metal_mul = _new_node_safe(nt, "ShaderNodeMath")
-                mx = _new_node_safe(nt, "ShaderNodeMath")  # max(orig, metal_scaled)
-                if metal_mul is not None and mx is not None:
-                    try:
-                        metal_mul.operation = 'MULTIPLY'
-                        metal_mul.inputs[1].default_value = float(metal_scale)
-                        metal_mul.location = (bx - 120, by - 340)
-                    except Exception:
-                        pass
+                math_nodes = _new_math_nodes_safe(nt, (
+                    ('MULTIPLY', (bx - 120, by - 340), None, float(metal_scale)),
+                    ('MAXIMUM', (bx + 60, by - 340), None, None),  # max(orig, metal_scaled)
+                ))
+                if math_nodes is not None:
+                    metal_mul, mx = math_nodes
                     _tag_preview_node(metal_mul, "METALNESS_SCALE")
-
-                    try:
-                        mx.operation = 'MAXIMUM'
-                        mx.location = (bx + 60, by - 340)
-                    except Exception:
-                        pass
-                    _tag_preview_node(mx, "METALLIC_MAX", restore={
-                        "target_node": bsdf.name,
-                        "target_socket": "Metallic",
-                        "orig_linked": bool(orig_linked),
-                        "orig_from_node": orig_from_node,
-                        "orig_from_socket": orig_from_socket,
-                        "orig_default": orig_default,
-                    })
+                    _tag_preview_node(mx, "METALLIC_MAX", restore=_restore("Metallic", orig_linked, orig_from_node, orig_from_socket, orig_default))
 
                     _unlink_input_socket(nt, metal_in)
 
                     # Original metallic source
                     if orig_linked and orig_from_node and orig_from_socket:
-                        try:
-                            src_node = nodes.get(orig_from_node)
-                            src_sock = src_node.outputs.get(orig_from_socket) if src_node else None
-                            if src_sock:
-                                bw_orig = _new_node_safe(nt, "ShaderNodeRGBToBW")
-                                if bw_orig is not None:
-                                    try:
-                                        bw_orig.location = (bx - 320, by - 420)
-                                    except Exception:
-                                        pass
-                                    _tag_preview_node(bw_orig, "METALLIC_ORIG_BW")
-                                    links.new(src_sock, bw_orig.inputs["Color"])
-                                    links.new(bw_orig.outputs["Val"], mx.inputs[0])
-                                else:
-                                    links.new(src_sock, mx.inputs[0])
-                        except Exception:
-                            pass
-                    else:
-                        val = _new_node_safe(nt, "ShaderNodeValue")
-                        if val is not None:
-                            try:
-                                val.location = (bx - 320, by - 420)
-                                val.outputs[0].default_value = float(orig_default if orig_default is not None else 0.0)
-                            except Exception:
-                                pass
-                            _tag_preview_node(val, "METALLIC_ORIG_VALUE")
-                            try:
-                                links.new(val.outputs[0], mx.inputs[0])
-                            except Exception:
-                                pass
-
-                    # Metalness from specular blue channel (scaled)
-                    try:
-                        if sep is not None:
-                            links.new(sep.outputs["B"], metal_mul.inputs[0])
-                        else:
-                            bw = _new_node_safe(nt, "ShaderNodeRGBToBW")
-                            if bw is not None:
-                                _tag_preview_node(bw, "SPEC_BW_FALLBACK_METAL")
-                                links.new(tex.outputs["Color"], bw.inputs["Color"])
-                                links.new(bw.outputs["Val"], metal_mul.inputs[0])
-                    except Exception:
-                        pass
+                        src_sock = _node_output(_nodes_get, orig_from_node, orig_from_socket)
+                        if src_sock is not None:
+                            bw_orig = _place_preview_node(nt, "ShaderNodeRGBToBW", (bx - 320, by - 420), "METALLIC_ORIG_BW")
+                            if bw_orig is not None:
+                                if _safe_link(_links_new, src_sock, bw_orig.inputs.get("Color")):
+                                    _safe_link(_links_new, bw_orig.outputs.get("Val"), mx.inputs[0])
+                            else:
+                                _safe_link(_links_new, src_sock, mx.inputs[0])
+                    else:
+                        val = _place_preview_node(nt, "ShaderNodeValue", (bx - 320, by - 420), "METALLIC_ORIG_VALUE", value=float(orig_default if orig_default is not None else 0.0))
+                        if val is not None:
+                            _safe_link(_links_new, val.outputs[0], mx.inputs[0])
 
-                    try:
-                        links.new(metal_mul.outputs[0], mx.inputs[1])
-                    except Exception:
-                        pass
+                    # Metalness from specular blue channel (scaled)
+                    if sep is not None:
+                        _safe_link(_links_new, sep.outputs.get("B"), metal_mul.inputs[0])
+                    else:
+                        bw = _place_preview_node(nt, "ShaderNodeRGBToBW", None, "SPEC_BW_FALLBACK_METAL")
+                        if bw is not None:
+                            if _safe_link(_links_new, tex.outputs.get("Color"), bw.inputs.get("Color")):
+                                _safe_link(_links_new, bw.outputs.get("Val"), metal_mul.inputs[0])
 
-                    try:
-                        links.new(mx.outputs[0], metal_in)
+                    _safe_link(_links_new, metal_mul.outputs[0], mx.inputs[1])
+
+                    if _safe_link(_links_new, mx.outputs[0], metal_in):
                         applied_any = True
-                    except Exception:
-                        pass
 
     # ---------------------------------------------------------------------
     # Normal: combine user normal with detailNormal via Vector Add -> Normalize
     # ---------------------------------------------------------------------
     detail_norm = (entry.get("detailNormal") or "").strip()
-    if detail_norm and os.path.isfile(detail_norm) and ("Normal" in bsdf.inputs):
-        norm_in = bsdf.inputs["Normal"]
-        orig_linked = bool(norm_in.is_linked)
-        orig_from_node = ""
-        orig_from_socket = ""
-
-        if orig_linked:
-            try:
-                lnk = norm_in.links[0]
-                orig_from_node = lnk.from_node.name
-                orig_from_socket = lnk.from_socket.name
-            except Exception:
-                orig_linked = False
+    norm_in = inputs_by_name.get("Normal")
+    if detail_norm and _isfile_cached(detail_norm, ov.isfile_cache) and norm_in is not None:
+        orig_linked, orig_from_node, orig_from_socket, _ = _capture_socket_wiring(norm_in, coerce=None)
 
         tex = _make_image_texture_node(nt, detail_norm, non_color=True, role="DETAIL_NORMAL", loc=(bx - 520, by - 380))
         if tex is not None:
@@ -4272,35 +4662,20 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
             except Exception:
                 pass
             # Apply detail UV transform (preview-only)
-            try:
-                if detail_uv_out is not None and "Vector" in tex.inputs:
-                    links.new(detail_uv_out, tex.inputs["Vector"])
-            except Exception:
-                pass
-            nmap = _new_node_safe(nt, "ShaderNodeNormalMap")
+            _safe_link(_links_new, detail_uv_out, tex.inputs.get("Vector"))
+            nmap = _place_preview_node(nt, "ShaderNodeNormalMap", (bx - 320, by - 380), "DETAIL_NORMALMAP")
             if nmap is not None:
-                try:
-                    nmap.location = (bx - 320, by - 380)
-                except Exception:
-                    pass
-                _tag_preview_node(nmap, "DETAIL_NORMALMAP")
-
-                try:
-                    links.new(tex.outputs["Color"], nmap.inputs["Color"])
-                except Exception:
-                    pass
+                _safe_link(_links_new, tex.outputs.get("Color"), nmap.inputs.get("Color"))
 
                 _unlink_input_socket(nt, norm_in)
 
                 if orig_linked and orig_from_node and orig_from_socket:
-                    add = _new_node_safe(nt, "ShaderNodeVectorMath")
-                    norm = _new_node_safe(nt, "ShaderNodeVectorMath")
+                    add = _new_node_safe(nt, "ShaderNodeVectorMath", loc=(bx - 120, by - 380))
+                    norm = _new_node_safe(nt, "ShaderNodeVectorMath", loc=(bx + 60, by - 380))
                     if add and norm:
                         try:
                             add.operation = 'ADD'
                             norm.operation = 'NORMALIZE'
-                            add.location = (bx - 120, by - 380)
-                            norm.location = (bx + 60, by - 380)
                         except Exception:
                             pass
                         _tag_preview_node(add, "NORMAL_ADD")
@@ -4312,23 +4687,13 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                             "orig_from_socket": orig_from_socket,
                         })
 
-                        try:
-                            src_node = nodes.get(orig_from_node)
-                            src_sock = src_node.outputs.get(orig_from_socket) if src_node else None
-                            if src_sock:
-                                links.new(src_sock, add.inputs[0])
-                        except Exception:
-                            pass
-                        try:
-                            links.new(nmap.outputs["Normal"], add.inputs[1])
-                            links.new(add.outputs["Vector"], norm.inputs[0])
-                            links.new(norm.outputs["Vector"], norm_in)
+                        _safe_link(_links_new, _node_output(_nodes_get, orig_from_node, orig_from_socket), add.inputs[0])
+                        if (_safe_link(_links_new, nmap.outputs.get("Normal"), add.inputs[1])
+                                and _safe_link(_links_new, add.outputs.get("Vector"), norm.inputs[0])
+                                and _safe_link(_links_new, norm.outputs.get("Vector"), norm_in)):
                             applied_any = True
-                        except Exception:
-                            pass
                 else:
-                    try:
-                        links.new(nmap.outputs["Normal"], norm_in)
+                    if _safe_link(_links_new, nmap.outputs.get("Normal"), norm_in):
                         _tag_preview_node(nmap, "DETAIL_NORMALMAP", restore={
                             "target_node": bsdf.name,
                             "target_socket": "Normal",
@@ -4337,15 +4702,39 @@ def _apply_material_template_preview_maps(mat: bpy.types.Material, material_temp
                             "orig_from_socket": "",
                         })
                         applied_any = True
-                    except Exception:
-                        pass
 
     return applied_any
-def _restore_from_preview_node(node_tree: bpy.types.NodeTree, nodes, restore_json: str, restoring_node=None) -> None:
-    if not restore_json:
+
+
+def _build_input_link_index(node_tree: bpy.types.NodeTree) -> Dict[Any, List[Any]]:
+    """to_socket -> [from_node, ...] from one walk over node_tree.links.
+
+    NodeSocket.links is a Python property that scans every link in the tree, so per-socket
+    lookups during a clear pass are O(links) each; this index makes them a dict hit.
+    """
+    idx: Dict[Any, List[Any]] = {}
+    try:
+        for lnk in node_tree.links:
+            idx.setdefault(lnk.to_socket, []).append(lnk.from_node)
+    except Exception:
+        pass
+    return idx
+
+
+def _restore_from_preview_node(node_tree: bpy.types.NodeTree, nodes, restore, restoring_node=None,
+                               input_links_idx: Optional[Dict[Any, List[Any]]] = None) -> None:
+    """Rewire a BSDF input from a restore record (ID-property group, or a legacy JSON string).
+
+    `nodes` only needs .get(name): the tree's node collection, or a prebuilt name -> node dict.
+    """
+    if not restore:
         return
     try:
-        data = json.loads(restore_json)
+        if isinstance(restore, str):
+            data = _restore_json_loads(restore)
+        else:
+            raw = restore.to_dict() if hasattr(restore, "to_dict") else dict(restore)
+            data = {_RESTORE_LONG_KEYS.get(k, k): v for k, v in raw.items()}
     except Exception:
         return
     target_node = data.get("target_node") or ""
@@ -4364,13 +4753,19 @@ def _restore_from_preview_node(node_tree: bpy.types.NodeTree, nodes, restore_jso
     # stomping persistent hookups like the DECAL image that we intentionally keep.
     if restoring_node is not None:
         try:
-            if getattr(inp, 'is_linked', False) and getattr(inp, 'links', None):
+            if input_links_idx is not None:
+                from_nodes = input_links_idx.get(inp)
+                if from_nodes and restoring_node not in from_nodes:
+                    return
+            elif getattr(inp, 'is_linked', False) and getattr(inp, 'links', None):
                 if not any(getattr(lnk, 'from_node', None) == restoring_node for lnk in inp.links):
                     return
         except Exception:
             pass
 
     _unlink_input_socket(node_tree, inp)
+    if input_links_idx is not None:
+        input_links_idx.pop(inp, None)
 
     if data.get("orig_linked"):
         orig_from_node = data.get("orig_from_node") or ""
@@ -4381,6 +4776,9 @@ def _restore_from_preview_node(node_tree: bpy.types.NodeTree, nodes, restore_jso
             if out is not None:
                 try:
                     node_tree.links.new(out, inp)
+                    # Keep the index in step so later markers on this socket see the restored source.
+                    if input_links_idx is not None:
+                        input_links_idx[inp] = [src]
                 except Exception:
                     pass
     else:
@@ -4392,69 +4790,114 @@ def _restore_from_preview_node(node_tree: bpy.types.NodeTree, nodes, restore_jso
                 pass
 
 
+class _PreviewNodeState(NamedTuple):
+    node: Any
+    is_preview: bool
+    persist: bool
+    restore: Any  # ID-property group, or a JSON string from older files
+    restore_alpha: Any
+
+
+def _snapshot_preview_state(nodes) -> List[_PreviewNodeState]:
+    """Read the preview ID props of every node once (a single items() fetch per node)."""
+    out: List[_PreviewNodeState] = []
+    append = out.append
+    for n in nodes:
+        try:
+            props = dict(n.items())
+        except Exception:
+            props = {}
+        if props.get("i3d_preview_only", False):
+            is_preview = True
+        else:
+            try:
+                is_preview = (n.label or "").startswith("I3D_PREVIEW_ONLY:")
+            except Exception:
+                is_preview = False
+        if not is_preview:
+            append(_PreviewNodeState(n, False, False, "", ""))
+            continue
+        append(_PreviewNodeState(
+            n,
+            True,
+            bool(props.get("i3d_preview_persist", False)),
+            props.get("i3d_preview_restore") or "",
+            props.get("i3d_preview_restore_alpha") or "",
+        ))
+    return out
+
+
+def _tree_may_have_preview(nt) -> bool:
+    """False only when the tree's i3d_has_preview tag says it was cleared/stripped since its last preview.
+
+    A missing tag (files from before the marker existed) counts as maybe, so those trees still get a full scan.
+    """
+    try:
+        has_preview = nt.get("i3d_has_preview")
+    except Exception:
+        return True
+    return has_preview is None or bool(has_preview)
+
+
 def _clear_preview_nodes_in_material(mat: bpy.types.Material) -> int:
     if not mat or not mat.use_nodes or not mat.node_tree:
         return 0
     nt = mat.node_tree
     nodes = nt.nodes
 
+    # Fast path: the tree was cleared/stripped since its last preview.
+    if not _tree_may_have_preview(nt):
+        return 0
+
     # Restore material-level preview settings (alpha preview can change these).
     _restore_preview_methods(mat)
 
+    # One scan snapshots the preview ID props, partitioned once for the passes below.
+    # Persistent preview nodes (like a chosen DECAL image) must keep their current
+    # hookups and stay in the tree, so they skip both passes.
+    snapshot = _snapshot_preview_state(nodes)
+    removable = [st for st in snapshot if st.is_preview and not st.persist]
+    others = [st.node for st in snapshot if not st.is_preview]
+    has_persistent = len(removable) + len(others) < len(snapshot)
+
     # First restore original links/values from any restore markers.
-    for n in list(nodes):
-        if not _is_preview_only_node(n):
-            continue
-        # Persistent preview nodes (like a chosen DECAL image) must keep their current
-        # hookups; do not run restore markers on them.
-        try:
-            if bool(n.get('i3d_preview_persist', False)):
-                continue
-        except Exception:
-            pass
-        try:
-            rj = n.get("i3d_preview_restore", "")
-        except Exception:
-            try:
-                rj = n["i3d_preview_restore"]
-            except Exception:
-                rj = ""
-        if rj:
-            _restore_from_preview_node(nt, nodes, rj, restoring_node=n)
-        # Optional second restore marker (e.g., DECAL alpha hookup).
-        try:
-            ra = n.get("i3d_preview_restore_alpha", "")
-        except Exception:
-            ra = ""
-        if ra:
+    # bpy_prop_collection.get() scans the collection, so resolve names through one dict instead.
+    if removable:
+        input_links_idx = _build_input_link_index(nt)
+        nodes_by_name = {}
+        for st in snapshot:
             try:
-                _restore_from_preview_node(nt, nodes, ra, restoring_node=n)
+                nodes_by_name[st.node.name] = st.node
             except Exception:
                 pass
+        for st in removable:
+            n = st.node
+            if st.restore:
+                _restore_from_preview_node(nt, nodes_by_name, st.restore, restoring_node=n, input_links_idx=input_links_idx)
+            # Optional second restore marker (e.g., DECAL alpha hookup).
+            if st.restore_alpha:
+                try:
+                    _restore_from_preview_node(nt, nodes_by_name, st.restore_alpha, restoring_node=n, input_links_idx=input_links_idx)
+                except Exception:
+                    pass
 
-
-    # Then remove all preview-tagged nodes.
+    # Then remove all preview-tagged nodes, plus legacy untagged orphans (checked after the
+    # restores since that test looks at the current links).
     removed = 0
-    for n in list(nodes):
-        # Keep preview-persistent nodes (e.g. user-selected decal base image) even when clearing preview.
-        if _is_preview_only_node(n):
-            try:
-                if bool(n.get("i3d_preview_persist", False)):
-                    continue
-            except Exception:
-                pass
-            try:
-                nodes.remove(n)
-                removed += 1
-            except Exception:
-                pass
-            continue
-        if _is_legacy_orphan_preview_node(n):
-            try:
-                nodes.remove(n)
-                removed += 1
-            except Exception:
-                pass
+    doomed = [st.node for st in removable]
+    doomed.extend(n for n in others if _is_legacy_orphan_preview_node(n))
+    for n in doomed:
+        try:
+            nodes.remove(n)
+            removed += 1
+        except Exception:
+            pass
+
+    # Persistent preview nodes stay tagged, so only drop the marker when none are left.
+    try:
+        nt["i3d_has_preview"] = has_persistent
+    except Exception:
+        pass
     return removed
 
 
@@ -4464,7 +4907,8 @@ def _apply_preview_preset_to_material(mat: bpy.types.Material, material_template
     The old code applied scalar Principled presets based on guessed keywords.
     DTAP now wants real detail-map preview injection from materialTemplates.xml.
 
-    Returns 'MAPS' if preview maps were injected, '' otherwise.
+    Returns 'MAPS' if preview maps were injected, '' otherwise. Never raises, so callers
+    need no try/except around it (or around the _mtpl_apply_overrides block wrapping it).
     """
     ok = False
     try:
@@ -4475,33 +4919,64 @@ def _apply_preview_preset_to_material(mat: bpy.types.Material, material_template
 
 
 
+_MISSING_ATTR = object()
+# Where a color item may carry its template: the enum id first, then raw strings (Giants library colors).
+_ITEM_TEMPLATE_FIELDS = ("xml_material_template", "parentTemplate", "parentTemplateValue", "materialTemplate", "materialTemplateName")
+_ITEM_TEMPLATE_FIELDS_BY_TYPE: Dict[type, Tuple[str, ...]] = {}
+
+
+def _item_template_fields(item) -> Tuple[str, ...]:
+    """The template fields that exist on item's RNA type (resolved once per PropertyGroup class)."""
+    t = type(item)
+    fields = _ITEM_TEMPLATE_FIELDS_BY_TYPE.get(t)
+    if fields is None:
+        try:
+            props = t.bl_rna.properties
+            fields = tuple(f for f in _ITEM_TEMPLATE_FIELDS if f in props)
+        except Exception:
+            # Not an RNA type: attributes may differ per instance, so probe them all.
+            return _ITEM_TEMPLATE_FIELDS
+        _ITEM_TEMPLATE_FIELDS_BY_TYPE[t] = fields
+    return fields
+
+
 def _get_item_material_template_value(item) -> str:
     """Best-effort extraction of the material template name from a color item."""
     if item is None:
         return ""
 
-    # Enum (stored as enum id); use existing helpers if present in this module.
-    if hasattr(item, "xml_material_template"):
+    for attr in _item_template_fields(item):
         try:
-            return _mt_value_from_enum_id(item.xml_material_template)  # type: ignore[name-defined]
+            v = getattr(item, attr, _MISSING_ATTR)
         except Exception:
+            continue
+        if v is _MISSING_ATTR:
+            continue
+        if attr == "xml_material_template":
+            # Enum (stored as enum id)
             try:
-                return str(item.xml_material_template)
-            except Exception:
-                return ""
-
-    # Raw string field (Giants library colors).
-    for attr in ("parentTemplate", "parentTemplateValue", "materialTemplate", "materialTemplateName"):
-        if hasattr(item, attr):
-            try:
-                v = getattr(item, attr)
-                return str(v) if v else ""
+                return _mt_value_from_enum_id(v)
             except Exception:
-                pass
+                try:
+                    return str(v)
+                except Exception:
+                    return ""
+        return str(v) if v else ""
 
     return ""
 
+# customParameter_colorScale text: the parsed triplet plus a fixed alpha of 1.0.
+_COLORSCALE_IDPROP_FMT = "%.6f %.6f %.6f 1.0"
+# XML colorScale attribute text (no alpha).
+_COLORSCALE_TEXT_FMT = "%.4f %.4f %.4f"
+
+
 def _apply_giants_colorscale(mat: bpy.types.Material, color_scale_triplet: str) -> bool:
+    """Write customParameter_colorScale and tag the material for update.
+
+    No view-layer update is forced; callers that need evaluated data should fetch the
+    depsgraph themselves (evaluated_depsgraph_get()).
+    """
     if not mat:
         return False
     cs = (color_scale_triplet or "").strip()
@@ -4511,16 +4986,13 @@ def _apply_giants_colorscale(mat: bpy.types.Material, color_scale_triplet: str)
     trip = _parse_color_scale_triplet(cs)
     if trip is None:
         return False
-    mat["customParameter_colorScale"] = f"{trip[0]:.6f} {trip[1]:.6f} {trip[2]:.6f} 1.0"
+    mat["customParameter_colorScale"] = _COLORSCALE_IDPROP_FMT % trip
+    # Tag only: the depsgraph evaluates tagged IDs once after the operator returns, so a forced
+    # view_layer.update() here would just add a synchronous full evaluation.
     try:
         mat.update_tag()
     except Exception:
         pass
-    try:
-        if bpy.context.view_layer:
-            bpy.context.view_layer.update()
-    except Exception:
-        pass
     return True
 
 
@@ -4544,37 +5016,23 @@ def _reset_material_node_tree_to_principled(mat: bpy.types.Material) -> bool:
         return False
 
     try:
-        # Remove all links first
+        # Remove all nodes (their links go with them) in one C-level call.
+        nodes = nt.nodes
         try:
-            for lnk in list(nt.links):
-                try:
-                    nt.links.remove(lnk)
-                except Exception:
-                    pass
+            nodes.clear()
         except Exception:
-            pass
-
-        # Remove all nodes
-        try:
-            for n in list(nt.nodes):
+            # Per-node fallback if clear() is unavailable or fails part-way.
+            for n in list(nodes):
                 try:
-                    nt.nodes.remove(n)
+                    nodes.remove(n)
                 except Exception:
                     pass
-        except Exception:
-            pass
 
-        out = _new_node_safe(nt, "ShaderNodeOutputMaterial")
-        bsdf = _new_node_safe(nt, "ShaderNodeBsdfPrincipled")
+        out = _new_node_safe(nt, "ShaderNodeOutputMaterial", loc=(300, 0))
+        bsdf = _new_node_safe(nt, "ShaderNodeBsdfPrincipled", loc=(0, 0))
         if out is None or bsdf is None:
             return False
 
-        try:
-            bsdf.location = (0, 0)
-            out.location = (300, 0)
-        except Exception:
-            pass
-
         try:
             nt.links.new(bsdf.outputs.get("BSDF"), out.inputs.get("Surface"))
         except Exception:
@@ -4594,17 +5052,20 @@ def _strip_all_preview_tags_in_material(mat: bpy.types.Material) -> int:
     if not mat or not mat.use_nodes or not mat.node_tree:
         return 0
     nt = mat.node_tree
+    if not _tree_may_have_preview(nt):
+        return 0
     removed = 0
     for n in list(nt.nodes):
         try:
-            # Remove known ID props used for preview-only nodes
+            # Remove known ID props used for preview-only nodes (keys fetched once per node)
+            keys = n.keys()
             for k in ("i3d_preview_only", "i3d_preview_role", "i3d_preview_restore"):
-                try:
-                    if k in n:
+                if k in keys:
+                    try:
                         del n[k]
                         removed += 1
-                except Exception:
-                    pass
+                    except Exception:
+                        pass
         except Exception:
             pass
         try:
@@ -4613,6 +5074,10 @@ def _strip_all_preview_tags_in_material(mat: bpy.types.Material) -> int:
                 n.label = lab.replace("I3D_PREVIEW_ONLY:", "", 1)
         except Exception:
             pass
+    try:
+        nt["i3d_has_preview"] = False
+    except Exception:
+        pass
     return removed
 
 
@@ -4626,22 +5091,24 @@ def _apply_color_item_permanent_to_material(context, item) -> bool:
     if not mat:
         return False
 
+    try:
+        col = getattr(item, "color", None)
+        col = tuple(col) if col is not None else None
+    except Exception:
+        col = None
+    mt_name = _get_item_material_template_value(item)
+
     if not _reset_material_node_tree_to_principled(mat):
         return False
 
     ok = True
     try:
-        col = getattr(item, "color", None)
         if col is not None:
-            ok = _apply_color_to_material(mat, tuple(_norm_color(col)))
+            ok = _apply_color_to_material(mat, _norm_rgb(col))
     except Exception:
         ok = False
 
-    try:
-        mt_name = _get_item_material_template_value(item)
-        _apply_preview_preset_to_material(mat, mt_name)
-    except Exception:
-        pass
+    _apply_preview_preset_to_material(mat, mt_name)
 
     try:
         _strip_all_preview_tags_in_material(mat)
@@ -4655,18 +5122,25 @@ def _apply_color_item_permanent_to_material(context, item) -> bool:
 # GIANTS Export helpers (Vehicle Shader custom properties)
 # -----------------------------------------------------------------------------
 
-def _colorscale_text_for_item(item, src: str) -> str:
-    """Return the colorScale string (3 floats) used by GIANTS templates."""
-    rgb = _norm_color(getattr(item, "color", (1.0, 1.0, 1.0)))
-    cs_attr = ""
-    try:
-        cs_attr = str(getattr(item, "colorScale", "") or "").strip()
-    except Exception:
-        cs_attr = ""
-    if cs_attr and src in ('GIANTS', 'POPULAR'):
+def _colorscale_text_for_item(item, src: str, rgb: Any = None) -> str:
+    """Return the colorScale string (3 floats) used by GIANTS templates.
+
+    `rgb` lets callers pass the item color they already read; it is normalized here either way.
+    """
+    if src in ('GIANTS', 'POPULAR'):
+        return _colorscale_text_for_library_item(item, rgb)
+    if rgb is None:
+        rgb = getattr(item, "color", (1.0, 1.0, 1.0))
+    return _COLORSCALE_TEXT_FMT % _giants_srgb_triplet_from_color(rgb)
+
+
+def _colorscale_text_for_library_item(item, rgb: Any = None) -> str:
+    """_colorscale_text_for_item for GIANTS/Popular items (no source dispatch)."""
+    # Library items always define colorScale; the cache build stores it already stripped.
+    cs_attr = item.colorScale
+    if cs_attr:
         return cs_attr
-    r, g, b = _giants_srgb_triplet_from_color(rgb)
-    return f"{r:.4f} {g:.4f} {b:.4f}"
+    return _COLORSCALE_TEXT_FMT % _giants_srgb_triplet_from_color(item.color if rgb is None else rgb)
 
 
 def _clear_vehicle_shader_export_props(mat: bpy.types.Material) -> None:
@@ -4700,12 +5174,22 @@ def _clear_vehicle_shader_export_props(mat: bpy.types.Material) -> None:
 
 # Material templates where the swatch tint is ignored/overridden by detailDiffuse being pre-colored.
 # (These should NOT write customParameter_colorScale.)
-_NO_COLOR_SCALE_MATERIAL_TEMPLATES = {
+_NO_COLOR_SCALE_MATERIAL_TEMPLATES = frozenset((
     "rubberblack",
     "woodcedar",
     "woodoak",
     "leatherbrown",
-}
+))
+
+
+@functools.lru_cache(maxsize=256)
+def _template_export_meta(material_template_value: str) -> Tuple[str, bool, bool]:
+    """(stripped value, is set (not empty/'NONE'), wants colorScale) for a template value."""
+    mtv = (material_template_value or "").strip()
+    is_set = bool(mtv) and mtv.upper() != "NONE"
+    # Some "one-off" templates ignore swatch tint (detailDiffuse is already colored).
+    wants_colorscale = not (is_set and mtv.lower() in _NO_COLOR_SCALE_MATERIAL_TEMPLATES)
+    return mtv, is_set, wants_colorscale
 
 
 def _set_vehicle_shader_export_props_material(
@@ -4725,13 +5209,7 @@ def _set_vehicle_shader_export_props_material(
     if not mat:
         return
     try:
-        mtv = (material_template_value or "").strip()
-        mtv_key = mtv.lower()
-
-        # Some "one-off" templates ignore swatch tint (detailDiffuse is already colored).
-        wants_colorscale = True
-        if mtv and mtv.upper() != "NONE" and mtv_key in _NO_COLOR_SCALE_MATERIAL_TEMPLATES:
-            wants_colorscale = False
+        mtv, is_set, wants_colorscale = _template_export_meta(str(material_template_value or ""))
 
         if wants_colorscale and color_scale_triplet:
             mat["customParameter_colorScale"] = str(color_scale_triplet)
@@ -4739,8 +5217,8 @@ def _set_vehicle_shader_export_props_material(
             if "customParameter_colorScale" in mat:
                 del mat["customParameter_colorScale"]
 
-        if mtv and mtv.upper() != "NONE":
-            mat["customParameterTemplate_brandColor_material"] = str(mtv)
+        if is_set:
+            mat["customParameterTemplate_brandColor_material"] = mtv
         else:
             # DO NOT write the property at all if user selected None
             if "customParameterTemplate_brandColor_material" in mat:
@@ -4780,6 +5258,22 @@ def _set_vehicle_shader_export_props_brandcolor(
         pass
 
 
+# bpy.ops.i3d.<name> builds fresh wrapper objects on every attribute access; resolve it once.
+_PICK_DECAL_OP = None
+
+
+def _invoke_pick_decal_base_image(**kw):
+    """Open the decal base-image file picker for a library entry (src, index, is_permanent, ...).
+
+    Operators cannot be instantiated from Python, so this still goes through bpy.ops; it only
+    skips re-resolving the operator wrapper on every decal click.
+    """
+    global _PICK_DECAL_OP
+    if _PICK_DECAL_OP is None:
+        _PICK_DECAL_OP = bpy.ops.i3d.cl_pick_decal_base_image
+    return _PICK_DECAL_OP('INVOKE_DEFAULT', **kw)
+
+
 class I3D_CL_OT_ApplyMyToMaterial(bpy.types.Operator):
     bl_idname = "i3d.cl_my_apply_to_material"
     bl_label = "Apply Temporary preview to Material - No Giants Export"
@@ -4787,8 +5281,8 @@ class I3D_CL_OT_ApplyMyToMaterial(bpy.types.Operator):
     bl_options = {'UNDO'}
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_my_index
-        if not (0 <= idx < len(scene.i3d_cl_my_colors)):
+        idx, coll = _GET_MY_SELECTION(scene)
+        if not (0 <= idx < len(coll)):
             self.report({'WARNING'}, "No color selected")
             return {'CANCELLED'}
 
@@ -4797,7 +5291,7 @@ class I3D_CL_OT_ApplyMyToMaterial(bpy.types.Operator):
             self.report({'WARNING'}, "No active material")
             return {'CANCELLED'}
 
-        item = scene.i3d_cl_my_colors[idx]
+        item = coll[idx]
         mt_name = _get_item_material_template_value(item)
 
         # Decal TEMP preview: ask for user base-color image if none exists.
@@ -4810,7 +5304,7 @@ class I3D_CL_OT_ApplyMyToMaterial(bpy.types.Operator):
             base_fp = stored_fp or _material_get_basecolor_image_filepath(mat)
             if not base_fp:
                 # First-time: ask user to pick an image; the picker will remember it on the item.
-                return bpy.ops.i3d.cl_pick_decal_base_image('INVOKE_DEFAULT', src='MY', index=idx, is_permanent=False)
+                return _invoke_pick_decal_base_image(src='MY', index=idx, is_permanent=False)
 
             # If we discovered the decal image from the material and the item doesn't have one yet, store it.
             try:
@@ -4820,23 +5314,20 @@ class I3D_CL_OT_ApplyMyToMaterial(bpy.types.Operator):
             except Exception:
                 pass
 
-            ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
-            try:
-                with _mtpl_apply_overrides(
-                    detail_diffuse_mode='DECAL',
-                    decal_image_path=base_fp,
-                    decal_persist=True,
-                    apply_alpha=True,
-                ):
-                    _apply_preview_preset_to_material(mat, mt_name)
-            except Exception:
-                pass
+            ok = _apply_color_to_material(mat, _norm_rgb(tuple(item.color)))
+            with _mtpl_apply_overrides(
+                detail_diffuse_mode='DECAL',
+                decal_image_path=base_fp,
+                decal_persist=True,
+                apply_alpha=True,
+            ):
+                _apply_preview_preset_to_material(mat, mt_name)
 
             self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
             return {'FINISHED'} if ok else {'CANCELLED'}
 
         # Normal TEMP preview
-        ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
+        ok = _apply_color_to_material(mat, _norm_rgb(tuple(item.color)))
         if ok:
             _apply_preview_preset_to_material(mat, mt_name)
 
@@ -4856,8 +5347,8 @@ class I3D_CL_OT_ApplyMyToMaterialExport(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_my_index
-        if not (0 <= idx < len(scene.i3d_cl_my_colors)):
+        idx, coll = _GET_MY_SELECTION(scene)
+        if not (0 <= idx < len(coll)):
             self.report({'WARNING'}, "No color selected")
             return {'CANCELLED'}
 
@@ -4866,8 +5357,10 @@ class I3D_CL_OT_ApplyMyToMaterialExport(bpy.types.Operator):
             self.report({'WARNING'}, "No active material")
             return {'CANCELLED'}
 
-        item = scene.i3d_cl_my_colors[idx]
+        item = coll[idx]
         mt_name = _xml_material_template_from_item(item)
+        # Read once: used for the material color and the exported colorScale.
+        col = tuple(item.color)
 
         if _mtpl_is_decal(mt_name):
             stored_fp = str(getattr(item, "decal_image_path", "") or "").strip()
@@ -4876,7 +5369,7 @@ class I3D_CL_OT_ApplyMyToMaterialExport(bpy.types.Operator):
 
             base_fp = stored_fp or _material_get_basecolor_image_filepath(mat)
             if not base_fp:
-                return bpy.ops.i3d.cl_pick_decal_base_image('INVOKE_DEFAULT', src='MY', index=idx, is_permanent=False, set_export_props=True)
+                return _invoke_pick_decal_base_image(src='MY', index=idx, is_permanent=False, set_export_props=True)
 
             try:
                 if (not stored_fp) and base_fp:
@@ -4885,37 +5378,34 @@ class I3D_CL_OT_ApplyMyToMaterialExport(bpy.types.Operator):
             except Exception:
                 pass
 
-            ok = _apply_color_to_material(mat, tuple(item.color))
-            try:
-                with _mtpl_apply_overrides(
-                    detail_diffuse_mode="DECAL",
-                    decal_image_path=base_fp,
-                    decal_persist=True,
-                    apply_alpha=True,
-                ):
-                    _apply_preview_preset_to_material(mat, mt_name)
-            except Exception:
-                pass
+            ok = _apply_color_to_material(mat, col)
+            with _mtpl_apply_overrides(
+                detail_diffuse_mode="DECAL",
+                decal_image_path=base_fp,
+                decal_persist=True,
+                apply_alpha=True,
+            ):
+                _apply_preview_preset_to_material(mat, mt_name)
 
             if ok:
                 _clear_vehicle_shader_export_props(mat)
                 _set_vehicle_shader_export_props_material(
                     mat,
-                    material_template_value=_get_item_material_template_value(item),
-                    color_scale_triplet=_colorscale_text_for_item(item, 'MY'),
+                    material_template_value=mt_name,
+                    color_scale_triplet=_colorscale_text_for_item(item, 'MY', col),
                 )
 
             self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
             return {'FINISHED'} if ok else {'CANCELLED'}
 
-        ok = _apply_color_to_material(mat, tuple(item.color))
+        ok = _apply_color_to_material(mat, col)
         if ok:
             _apply_preview_preset_to_material(mat, mt_name)
             _clear_vehicle_shader_export_props(mat)
             _set_vehicle_shader_export_props_material(
                 mat,
-                material_template_value=_get_item_material_template_value(item),
-                color_scale_triplet=_colorscale_text_for_item(item, 'MY'),
+                material_template_value=mt_name,
+                color_scale_triplet=_colorscale_text_for_item(item, 'MY', col),
             )
 
         self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
@@ -4930,12 +5420,12 @@ class I3D_CL_OT_ApplyMyToMaterialPermanent(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_my_index
-        if not (0 <= idx < len(scene.i3d_cl_my_colors)):
+        idx, coll = _GET_MY_SELECTION(scene)
+        if not (0 <= idx < len(coll)):
             self.report({'WARNING'}, "No color selected")
             return {'CANCELLED'}
 
-        item = scene.i3d_cl_my_colors[idx]
+        item = coll[idx]
 
         mat = _get_active_material(context)
         if not mat:
@@ -4956,7 +5446,7 @@ class I3D_CL_OT_ApplyMyToMaterialPermanent(bpy.types.Operator):
 
             base_fp = stored_fp or _material_get_basecolor_image_filepath(mat)
             if not base_fp:
-                return bpy.ops.i3d.cl_pick_decal_base_image('INVOKE_DEFAULT', src='MY', index=idx, is_permanent=True)
+                return _invoke_pick_decal_base_image(src='MY', index=idx, is_permanent=True)
 
             try:
                 if (not stored_fp) and base_fp:
@@ -4991,8 +5481,8 @@ class I3D_CL_OT_ApplyMyToGiantsColorScale(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_my_index
-        if not (0 <= idx < len(scene.i3d_cl_my_colors)):
+        idx, coll = _GET_MY_SELECTION(scene)
+        if not (0 <= idx < len(coll)):
             self.report({'WARNING'}, "No color selected")
             return {'CANCELLED'}
 
@@ -5001,7 +5491,7 @@ class I3D_CL_OT_ApplyMyToGiantsColorScale(bpy.types.Operator):
             self.report({'WARNING'}, "No active material")
             return {'CANCELLED'}
 
-        txt = _giants_srgb_text(scene.i3d_cl_my_colors[idx].color)
+        txt = _giants_srgb_text(coll[idx].color)
         ok = _apply_giants_colorscale(mat, txt)
         self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Could not set customParameter_colorScale")
         return {'FINISHED'} if ok else {'CANCELLED'}
@@ -5037,17 +5527,17 @@ class I3D_CL_OT_CopySelected(bpy.types.Operator):
 
         item = None
         if self.src == 'MY':
-            idx = scene.i3d_cl_my_index
-            if 0 <= idx < len(scene.i3d_cl_my_colors):
-                item = scene.i3d_cl_my_colors[idx]
+            idx, coll = _GET_MY_SELECTION(scene)
+            if 0 <= idx < len(coll):
+                item = coll[idx]
         elif self.src == 'GIANTS':
-            idx = scene.i3d_cl_giants_index
-            if 0 <= idx < len(scene.i3d_cl_giants_colors):
-                item = scene.i3d_cl_giants_colors[idx]
+            idx, coll = _GET_GIANTS_SELECTION(scene)
+            if 0 <= idx < len(coll):
+                item = coll[idx]
         else:
-            idx = scene.i3d_cl_popular_index
-            if 0 <= idx < len(scene.i3d_cl_popular_colors):
-                item = scene.i3d_cl_popular_colors[idx]
+            idx, coll = _GET_POPULAR_SELECTION(scene)
+            if 0 <= idx < len(coll):
+                item = coll[idx]
 
         if not item:
             self.report({'WARNING'}, "No color selected")
@@ -5062,16 +5552,7 @@ class I3D_CL_OT_CopySelected(bpy.types.Operator):
             txt = f"{R}, {G}, {B}"
         elif self.kind == 'CSCALE':
             # XML expects 3 floats in [0..1] without alpha; preserve source XML when available.
-            cs_attr = ""
-            try:
-                cs_attr = str(getattr(item, "colorScale", "") or "").strip()
-            except Exception:
-                cs_attr = ""
-            if cs_attr and self.src in ('GIANTS', 'POPULAR'):
-                txt = cs_attr
-            else:
-                r, g, b = _giants_srgb_triplet_from_color(rgb)
-                txt = f"{r:.4f} {g:.4f} {b:.4f}"
+            txt = _colorscale_text_for_item(item, self.src, rgb)
         else:
             txt = _giants_srgb_text(rgb)
 
@@ -5096,25 +5577,117 @@ class I3D_CL_OT_GiantsRefresh(bpy.types.Operator):
         if _GIANTS_LAST_ERROR:
             self.report({'WARNING'}, _GIANTS_LAST_ERROR)
         else:
-            self.report({'INFO'}, "GIANTS library refreshed")
-        return {'FINISHED'}
+            self.report({'INFO'}, "GIANTS library refreshed")
+        return {'FINISHED'}
+
+
+
+class I3D_CL_OT_PopularRefresh(bpy.types.Operator):
+    bl_idname = "i3d.cl_popular_refresh"
+    bl_label = "Refresh Popular Library"
+    bl_description = "Reloads the Popular Color Library and refreshes the list."
+
+    def execute(self, context):
+        ensure_popular_cache(force=True)
+        rebuild_popular_visible(context.scene)
+        if _POPULAR_LAST_ERROR:
+            self.report({'WARNING'}, _POPULAR_LAST_ERROR)
+        else:
+            self.report({'INFO'}, "Popular library refreshed")
+        return {'FINISHED'}
+
+
+
+_LIBRARY_SRC_LABELS: Dict[str, str] = {'GIANTS': "GIANTS", 'POPULAR': "Popular"}
+
+
+def _apply_from_library(op, context, src: str, mode: str) -> set:
+    """Shared execute() for the GIANTS/Popular Apply operators.
+
+    src is 'GIANTS' or 'POPULAR'; mode is 'PREVIEW', 'EXPORT' or 'PERMANENT'.
+    """
+    idx, colors = _LIBRARY_SELECTION_GETTERS[src](context.scene)
+    permanent = (mode == 'PERMANENT')
+    export = (mode == 'EXPORT')
+
+    if not (0 <= idx < len(colors)):
+        op.report({'WARNING'}, f"No {_LIBRARY_SRC_LABELS[src]} color selected" if permanent else "No color selected")
+        return {'CANCELLED'}
+
+    mat = _get_active_material(context)
+    if not mat:
+        op.report({'WARNING'}, "No active material found" if permanent else "No active material")
+        return {'CANCELLED'}
+
+    item = colors[idx]
+
+    if permanent:
+        mt_name = _xml_material_template_from_item(item)
+        if _mtpl_blocks_permanent(mt_name):
+            op.report({'WARNING'}, "This Material Type requires the Vehicle Shader and cannot be applied as Permanent.")
+            return {'CANCELLED'}
+
+        # Decals: use existing Base Color image if present, otherwise prompt to pick one.
+        if _mtpl_is_decal(mt_name):
+            base_fp = _material_get_basecolor_image_filepath(mat)
+            if not base_fp:
+                return _invoke_pick_decal_base_image(src=src, index=idx, is_permanent=True)
+            try:
+                with _mtpl_apply_overrides(
+                    detail_diffuse_mode="DECAL",
+                    decal_image_path=base_fp,
+                    decal_persist=False,
+                    apply_alpha=True,
+                ):
+                    ok = _apply_color_item_permanent_to_material(context, item)
+            except Exception:
+                ok = False
+        elif _mtpl_needs_detail_prompt(mt_name):
+            return bpy.ops.i3d.cl_perm_apply_detail_prompt('INVOKE_DEFAULT', src=src, index=idx)
+        else:
+            ok = _apply_color_item_permanent_to_material(context, item)
 
+        op.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
+        return {'FINISHED'} if ok else {'CANCELLED'}
 
+    mt_name = _get_item_material_template_value(item)
+    is_decal = _mtpl_is_decal(mt_name)
 
-class I3D_CL_OT_PopularRefresh(bpy.types.Operator):
-    bl_idname = "i3d.cl_popular_refresh"
-    bl_label = "Refresh Popular Library"
-    bl_description = "Reloads the Popular Color Library and refreshes the list."
+    if is_decal and export and src == 'POPULAR':
+        op.report({'WARNING'}, "Decal is not allowed in Popular Library")
+        return {'CANCELLED'}
 
-    def execute(self, context):
-        ensure_popular_cache(force=True)
-        rebuild_popular_visible(context.scene)
-        if _POPULAR_LAST_ERROR:
-            self.report({'WARNING'}, _POPULAR_LAST_ERROR)
+    if is_decal:
+        base_fp = _material_get_basecolor_image_filepath(mat)
+        if not base_fp:
+            if export:
+                return _invoke_pick_decal_base_image(src=src, index=idx, is_permanent=False, set_export_props=True)
+            return _invoke_pick_decal_base_image(src=src, index=idx, is_permanent=False)
+
+    rgb = _norm_rgb(tuple(item.color))
+    ok = _apply_color_to_material(mat, rgb)
+    if is_decal:
+        with _mtpl_apply_overrides(detail_diffuse_mode='SKIP', apply_alpha=True):
+            _apply_preview_preset_to_material(mat, mt_name)
+    elif ok:
+        _apply_preview_preset_to_material(mat, mt_name)
+
+    if ok and export:
+        _clear_vehicle_shader_export_props(mat)
+        if src == 'POPULAR':
+            _set_vehicle_shader_export_props_material(
+                mat,
+                material_template_value=mt_name,
+                color_scale_triplet=_colorscale_text_for_library_item(item, rgb),
+            )
         else:
-            self.report({'INFO'}, "Popular library refreshed")
-        return {'FINISHED'}
+            _set_vehicle_shader_export_props_brandcolor(
+                mat,
+                template_name=item.name,
+            )
 
+    op.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
+    return {'FINISHED'} if ok else {'CANCELLED'}
 
 
 class I3D_CL_OT_ApplyGiantsToMaterial(bpy.types.Operator):
@@ -5123,41 +5696,8 @@ class I3D_CL_OT_ApplyGiantsToMaterial(bpy.types.Operator):
     bl_description = 'Apply Temporary Preview To Material - "Use to preview what the color selection will look like once its in Giants Editor and in game this will be ignored during export and can be removed in bulk on export tab"'
     bl_options = {'UNDO'}
     def execute(self, context):
-        scene = context.scene
-        idx = scene.i3d_cl_giants_index
-        if not (0 <= idx < len(scene.i3d_cl_giants_colors)):
-            self.report({'WARNING'}, "No color selected")
-            return {'CANCELLED'}
-
-        mat = _get_active_material(context)
-        if not mat:
-            self.report({'WARNING'}, "No active material")
-            return {'CANCELLED'}
-
-        item = scene.i3d_cl_giants_colors[idx]
-        mt_name = _get_item_material_template_value(item)
-
-        if _mtpl_is_decal(mt_name):
-            base_fp = _material_get_basecolor_image_filepath(mat)
-            if not base_fp:
-                return bpy.ops.i3d.cl_pick_decal_base_image('INVOKE_DEFAULT', src='GIANTS', index=idx, is_permanent=False)
-
-            ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
-            try:
-                with _mtpl_apply_overrides(detail_diffuse_mode='SKIP', apply_alpha=True):
-                    _apply_preview_preset_to_material(mat, mt_name)
-            except Exception:
-                pass
-
-            self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-            return {'FINISHED'} if ok else {'CANCELLED'}
-
-        ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
-        if ok:
-            _apply_preview_preset_to_material(mat, mt_name)
+        return _apply_from_library(self, context, 'GIANTS', 'PREVIEW')
 
-        self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-        return {'FINISHED'} if ok else {'CANCELLED'}
 
 
 
@@ -5171,53 +5711,8 @@ class I3D_CL_OT_ApplyGiantsToMaterialExport(bpy.types.Operator):
     bl_options = {'UNDO'}
 
     def execute(self, context):
-        scene = context.scene
-        idx = scene.i3d_cl_giants_index
-        if not (0 <= idx < len(scene.i3d_cl_giants_colors)):
-            self.report({'WARNING'}, "No color selected")
-            return {'CANCELLED'}
-
-        mat = _get_active_material(context)
-        if not mat:
-            self.report({'WARNING'}, "No active material")
-            return {'CANCELLED'}
-
-        item = scene.i3d_cl_giants_colors[idx]
-        mt_name = _get_item_material_template_value(item)
-
-        if _mtpl_is_decal(mt_name):
-            base_fp = _material_get_basecolor_image_filepath(mat)
-            if not base_fp:
-                return bpy.ops.i3d.cl_pick_decal_base_image('INVOKE_DEFAULT', src='GIANTS', index=idx, is_permanent=False, set_export_props=True)
-
-            ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
-            try:
-                with _mtpl_apply_overrides(detail_diffuse_mode='SKIP', apply_alpha=True):
-                    _apply_preview_preset_to_material(mat, mt_name)
-            except Exception:
-                pass
-
-            if ok:
-                _clear_vehicle_shader_export_props(mat)
-                _set_vehicle_shader_export_props_brandcolor(
-                    mat,
-                    template_name=getattr(item, "name", "") or "",
-                )
-
-            self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-            return {'FINISHED'} if ok else {'CANCELLED'}
-
-        ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
-        if ok:
-            _apply_preview_preset_to_material(mat, mt_name)
-            _clear_vehicle_shader_export_props(mat)
-            _set_vehicle_shader_export_props_brandcolor(
-                mat,
-                template_name=getattr(item, "name", "") or "",
-            )
+        return _apply_from_library(self, context, 'GIANTS', 'EXPORT')
 
-        self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-        return {'FINISHED'} if ok else {'CANCELLED'}
 
 class I3D_CL_OT_ApplyGiantsToMaterialPermanent(bpy.types.Operator):
     bl_idname = "i3d.cl_giants_apply_to_material_permanent"
@@ -5227,47 +5722,8 @@ class I3D_CL_OT_ApplyGiantsToMaterialPermanent(bpy.types.Operator):
 
 
     def execute(self, context):
-        scene = context.scene
-        idx = scene.i3d_cl_giants_index
-        if not (0 <= idx < len(scene.i3d_cl_giants_colors)):
-            self.report({'WARNING'}, "No GIANTS color selected")
-            return {'CANCELLED'}
-
-        item = scene.i3d_cl_giants_colors[idx]
-
-        mat = _get_active_material(context)
-        if not mat:
-            self.report({'WARNING'}, "No active material found")
-            return {'CANCELLED'}
-
-        mt_name = _xml_material_template_from_item(item)
-
-        if _mtpl_blocks_permanent(mt_name):
-            self.report({'WARNING'}, "This Material Type requires the Vehicle Shader and cannot be applied as Permanent.")
-            return {'CANCELLED'}
-
-        # Decals: use existing Base Color image if present, otherwise prompt to pick one.
-        if _mtpl_is_decal(mt_name):
-            base_fp = _material_get_basecolor_image_filepath(mat)
-            if not base_fp:
-                return bpy.ops.i3d.cl_pick_decal_base_image('INVOKE_DEFAULT', src='GIANTS', index=idx, is_permanent=True)
-            try:
-                with _mtpl_apply_overrides(
-                    detail_diffuse_mode="DECAL",
-                    decal_image_path=base_fp,
-                    decal_persist=False,
-                    apply_alpha=True,
-                ):
-                    ok = _apply_color_item_permanent_to_material(context, item)
-            except Exception:
-                ok = False
-        elif _mtpl_needs_detail_prompt(mt_name):
-            return bpy.ops.i3d.cl_perm_apply_detail_prompt('INVOKE_DEFAULT', src='GIANTS', index=idx)
-        else:
-            ok = _apply_color_item_permanent_to_material(context, item)
+        return _apply_from_library(self, context, 'GIANTS', 'PERMANENT')
 
-        self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-        return {'FINISHED'} if ok else {'CANCELLED'}
 
 class I3D_CL_OT_ApplyGiantsToGiantsColorScale(bpy.types.Operator):
     bl_idname = "i3d.cl_giants_apply_to_giants_colorscale"
@@ -5277,8 +5733,8 @@ class I3D_CL_OT_ApplyGiantsToGiantsColorScale(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_giants_index
-        if not (0 <= idx < len(scene.i3d_cl_giants_colors)):
+        idx, coll = _GET_GIANTS_SELECTION(scene)
+        if not (0 <= idx < len(coll)):
             self.report({'WARNING'}, "No GIANTS color selected")
             return {'CANCELLED'}
 
@@ -5287,7 +5743,7 @@ class I3D_CL_OT_ApplyGiantsToGiantsColorScale(bpy.types.Operator):
             self.report({'WARNING'}, "No active material")
             return {'CANCELLED'}
 
-        cs = scene.i3d_cl_giants_colors[idx].colorScale
+        cs = coll[idx].colorScale
         ok = _apply_giants_colorscale(mat, cs)
         self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Could not set customParameter_colorScale")
         return {'FINISHED'} if ok else {'CANCELLED'}
@@ -5301,18 +5757,12 @@ class I3D_CL_OT_AddGiantsToMyLibrary(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_giants_index
-        if not (0 <= idx < len(scene.i3d_cl_giants_colors)):
+        idx, coll = _GET_GIANTS_SELECTION(scene)
+        if not (0 <= idx < len(coll)):
             self.report({'WARNING'}, "No GIANTS color selected")
             return {'CANCELLED'}
 
-        g = scene.i3d_cl_giants_colors[idx]
-        unique_name = _ensure_unique_my_library_name(scene, g.name)
-        it = scene.i3d_cl_my_colors.add()
-        it.name = unique_name
-        it.color = g.color
-        scene.i3d_cl_my_index = len(scene.i3d_cl_my_colors) - 1
-        schedule_save()
+        _add_library_items_to_my_library(scene, coll, (idx,))
         self.report({'INFO'}, "Added to My Library")
         return {'FINISHED'}
 
@@ -5324,41 +5774,8 @@ class I3D_CL_OT_ApplyPopularToMaterial(bpy.types.Operator):
     bl_description = 'Apply Temporary Preview To Material - "Use to preview what the color selection will look like once its in Giants Editor and in game this will be ignored during export and can be removed in bulk on export tab"'
     bl_options = {'UNDO'}
     def execute(self, context):
-        scene = context.scene
-        idx = scene.i3d_cl_popular_index
-        if not (0 <= idx < len(scene.i3d_cl_popular_colors)):
-            self.report({'WARNING'}, "No color selected")
-            return {'CANCELLED'}
-
-        mat = _get_active_material(context)
-        if not mat:
-            self.report({'WARNING'}, "No active material")
-            return {'CANCELLED'}
-
-        item = scene.i3d_cl_popular_colors[idx]
-        mt_name = _get_item_material_template_value(item)
-
-        if _mtpl_is_decal(mt_name):
-            base_fp = _material_get_basecolor_image_filepath(mat)
-            if not base_fp:
-                return bpy.ops.i3d.cl_pick_decal_base_image('INVOKE_DEFAULT', src='POPULAR', index=idx, is_permanent=False)
-
-            ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
-            try:
-                with _mtpl_apply_overrides(detail_diffuse_mode='SKIP', apply_alpha=True):
-                    _apply_preview_preset_to_material(mat, mt_name)
-            except Exception:
-                pass
-
-            self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-            return {'FINISHED'} if ok else {'CANCELLED'}
-
-        ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
-        if ok:
-            _apply_preview_preset_to_material(mat, mt_name)
+        return _apply_from_library(self, context, 'POPULAR', 'PREVIEW')
 
-        self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-        return {'FINISHED'} if ok else {'CANCELLED'}
 
 
 
@@ -5372,36 +5789,8 @@ class I3D_CL_OT_ApplyPopularToMaterialExport(bpy.types.Operator):
     bl_options = {'UNDO'}
 
     def execute(self, context):
-        scene = context.scene
-        idx = scene.i3d_cl_popular_index
-        if not (0 <= idx < len(scene.i3d_cl_popular_colors)):
-            self.report({'WARNING'}, "No color selected")
-            return {'CANCELLED'}
-
-        mat = _get_active_material(context)
-        if not mat:
-            self.report({'WARNING'}, "No active material")
-            return {'CANCELLED'}
-
-        item = scene.i3d_cl_popular_colors[idx]
-        mt_name = _get_item_material_template_value(item)
-
-        if _mtpl_is_decal(mt_name):
-            self.report({'WARNING'}, "Decal is not allowed in Popular Library")
-            return {'CANCELLED'}
-
-        ok = _apply_color_to_material(mat, tuple(_norm_color(item.color)))
-        if ok:
-            _apply_preview_preset_to_material(mat, mt_name)
-            _clear_vehicle_shader_export_props(mat)
-            _set_vehicle_shader_export_props_material(
-                mat,
-                material_template_value=_get_item_material_template_value(item),
-                color_scale_triplet=_colorscale_text_for_item(item, 'POPULAR'),
-            )
+        return _apply_from_library(self, context, 'POPULAR', 'EXPORT')
 
-        self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-        return {'FINISHED'} if ok else {'CANCELLED'}
 
 class I3D_CL_OT_ApplyPopularToMaterialPermanent(bpy.types.Operator):
     bl_idname = "i3d.cl_popular_apply_to_material_permanent"
@@ -5411,47 +5800,8 @@ class I3D_CL_OT_ApplyPopularToMaterialPermanent(bpy.types.Operator):
 
 
     def execute(self, context):
-        scene = context.scene
-        idx = scene.i3d_cl_popular_index
-        if not (0 <= idx < len(scene.i3d_cl_popular_colors)):
-            self.report({'WARNING'}, "No Popular color selected")
-            return {'CANCELLED'}
-
-        item = scene.i3d_cl_popular_colors[idx]
-
-        mat = _get_active_material(context)
-        if not mat:
-            self.report({'WARNING'}, "No active material found")
-            return {'CANCELLED'}
-
-        mt_name = _xml_material_template_from_item(item)
-
-        if _mtpl_blocks_permanent(mt_name):
-            self.report({'WARNING'}, "This Material Type requires the Vehicle Shader and cannot be applied as Permanent.")
-            return {'CANCELLED'}
-
-        # Decals: use existing Base Color image if present, otherwise prompt to pick one.
-        if _mtpl_is_decal(mt_name):
-            base_fp = _material_get_basecolor_image_filepath(mat)
-            if not base_fp:
-                return bpy.ops.i3d.cl_pick_decal_base_image('INVOKE_DEFAULT', src='POPULAR', index=idx, is_permanent=True)
-            try:
-                with _mtpl_apply_overrides(
-                    detail_diffuse_mode="DECAL",
-                    decal_image_path=base_fp,
-                    decal_persist=False,
-                    apply_alpha=True,
-                ):
-                    ok = _apply_color_item_permanent_to_material(context, item)
-            except Exception:
-                ok = False
-        elif _mtpl_needs_detail_prompt(mt_name):
-            return bpy.ops.i3d.cl_perm_apply_detail_prompt('INVOKE_DEFAULT', src='POPULAR', index=idx)
-        else:
-            ok = _apply_color_item_permanent_to_material(context, item)
+        return _apply_from_library(self, context, 'POPULAR', 'PERMANENT')
 
-        self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Material could not be updated")
-        return {'FINISHED'} if ok else {'CANCELLED'}
 
 class I3D_CL_OT_ApplyPopularToGiantsColorScale(bpy.types.Operator):
     bl_idname = "i3d.cl_popular_apply_to_giants_colorscale"
@@ -5461,8 +5811,8 @@ class I3D_CL_OT_ApplyPopularToGiantsColorScale(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_popular_index
-        if not (0 <= idx < len(scene.i3d_cl_popular_colors)):
+        idx, coll = _GET_POPULAR_SELECTION(scene)
+        if not (0 <= idx < len(coll)):
             self.report({'WARNING'}, "No Popular color selected")
             return {'CANCELLED'}
 
@@ -5471,7 +5821,7 @@ class I3D_CL_OT_ApplyPopularToGiantsColorScale(bpy.types.Operator):
             self.report({'WARNING'}, "No active material")
             return {'CANCELLED'}
 
-        cs = scene.i3d_cl_popular_colors[idx].colorScale
+        cs = coll[idx].colorScale
         ok = _apply_giants_colorscale(mat, cs)
         self.report({'INFO'} if ok else {'WARNING'}, "Applied" if ok else "Could not set customParameter_colorScale")
         return {'FINISHED'} if ok else {'CANCELLED'}
@@ -5485,22 +5835,56 @@ class I3D_CL_OT_AddPopularToMyLibrary(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        idx = scene.i3d_cl_popular_index
-        if not (0 <= idx < len(scene.i3d_cl_popular_colors)):
+        idx, coll = _GET_POPULAR_SELECTION(scene)
+        if not (0 <= idx < len(coll)):
             self.report({'WARNING'}, "No Popular color selected")
             return {'CANCELLED'}
 
-        g = scene.i3d_cl_popular_colors[idx]
-        unique_name = _ensure_unique_my_library_name(scene, g.name)
-        it = scene.i3d_cl_my_colors.add()
-        it.name = unique_name
-        it.color = g.color
-        scene.i3d_cl_my_index = len(scene.i3d_cl_my_colors) - 1
-        schedule_save()
+        _add_library_items_to_my_library(scene, coll, (idx,))
         self.report({'INFO'}, "Added to My Library")
         return {'FINISHED'}
 
 
+class I3D_CL_OT_BatchAddToMyLibrary(bpy.types.Operator):
+    bl_idname = "i3d.cl_batch_add_to_my_library"
+    bl_label = "Add Colors to My Library"
+    bl_description = "Copies several GIANTS or Popular colors (by list index) into My Color Library."
+    bl_options = {'UNDO'}
+
+    src: bpy.props.EnumProperty(
+        items=[
+            ('GIANTS', 'Giants Library', ''),
+            ('POPULAR', 'Popular Color Library', ''),
+        ],
+        name="Source",
+        default='GIANTS',
+    )
+
+    indices: bpy.props.StringProperty(
+        name="Indices",
+        description="Comma-separated list indices of the colors to add",
+        default="",
+    )
+
+    def execute(self, context):
+        scene = context.scene
+        coll = _LIBRARY_SELECTION_GETTERS[self.src](scene)[1]
+
+        indices = []
+        for part in (self.indices or "").split(","):
+            part = part.strip()
+            if part.isdigit():
+                indices.append(int(part))
+
+        added = _add_library_items_to_my_library(scene, coll, indices)
+        if not added:
+            self.report({'WARNING'}, "No valid colors to add")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Added {added} color(s) to My Library")
+        return {'FINISHED'}
+
+
 
 
 
@@ -5524,11 +5908,6 @@ class I3D_CL_OT_PickDecalBaseImage(bpy.types.Operator, ImportHelper):
     )
     index: bpy.props.IntProperty(name="Index", default=-1)
 
-    set_export_props: bpy.props.BoolProperty(
-        name="Set GIANTS Export Props",
-        description="If enabled, also set Vehicle Shader export custom properties on the material.",
-        default=False,
-    )
     is_permanent: bpy.props.BoolProperty(name="Permanent", default=False)
 
     set_export_props: bpy.props.BoolProperty(
@@ -5545,16 +5924,7 @@ class I3D_CL_OT_PickDecalBaseImage(bpy.types.Operator, ImportHelper):
 
         # Resolve item from chosen library
         scene = context.scene
-        item = None
-        try:
-            if self.src == 'MY':
-                item = scene.i3d_cl_my_colors[self.index]
-            elif self.src == 'GIANTS':
-                item = scene.i3d_cl_giants_colors[self.index]
-            else:
-                item = scene.i3d_cl_popular_colors[self.index]
-        except Exception:
-            item = None
+        item = _library_item_at(scene, self.src, self.index)
 
         if item is None:
             self.report({'WARNING'}, "Invalid item selection")
@@ -5577,6 +5947,10 @@ class I3D_CL_OT_PickDecalBaseImage(bpy.types.Operator, ImportHelper):
                 item.decal_image_path = fp
             except Exception:
                 pass
+            _schedule_decal_icon_warmup((fp,))
+
+        # Resolved once; used by the preview apply and the export props below.
+        mt_name = _xml_material_template_from_item(item)
 
         # Apply with overrides: DECAL base color image + alpha
         try:
@@ -5590,7 +5964,6 @@ class I3D_CL_OT_PickDecalBaseImage(bpy.types.Operator, ImportHelper):
                     ok = _apply_color_item_permanent_to_material(context, item)
                 else:
                     # Temporary preview apply: keep nodes preview-only + optionally persistent
-                    mt_name = _xml_material_template_from_item(item)
                     _apply_color_to_material(mat, tuple(item.color))
                     _apply_preview_preset_to_material(mat, mt_name)
                     ok = True
@@ -5608,12 +5981,12 @@ class I3D_CL_OT_PickDecalBaseImage(bpy.types.Operator, ImportHelper):
                 if self.src == 'GIANTS':
                     _set_vehicle_shader_export_props_brandcolor(
                         mat,
-                        template_name=getattr(item, "name", "") or "",
+                        template_name=item.name,
                     )
                 else:
                     _set_vehicle_shader_export_props_material(
                         mat,
-                        material_template_value=_get_item_material_template_value(item),
+                        material_template_value=mt_name,
                         color_scale_triplet=_colorscale_text_for_item(item, self.src),
                     )
 
@@ -5702,16 +6075,7 @@ class I3D_CL_OT_PermApplyDetailPrompt(bpy.types.Operator):
 
     def execute(self, context):
         scene = context.scene
-        item = None
-        try:
-            if self.src == 'MY':
-                item = scene.i3d_cl_my_colors[self.index]
-            elif self.src == 'GIANTS':
-                item = scene.i3d_cl_giants_colors[self.index]
-            else:
-                item = scene.i3d_cl_popular_colors[self.index]
-        except Exception:
-            item = None
+        item = _library_item_at(scene, self.src, self.index)
         if item is None:
             self.report({'WARNING'}, "Invalid item selection")
             return {'CANCELLED'}
@@ -5743,9 +6107,18 @@ class I3D_CL_OT_ClearPreviewMaterialNodes(bpy.types.Operator):
         mats_touched = 0
         nodes_removed = 0
 
+        # Only trees tagged with preview nodes (or untagged legacy trees) can have anything to clear.
+        touched = []
         for mat in getattr(bpy.data, "materials", []):
-            if not mat or not getattr(mat, "use_nodes", False) or not getattr(mat, "node_tree", None):
+            if not mat or not getattr(mat, "use_nodes", False):
                 continue
+            nt = getattr(mat, "node_tree", None)
+            if nt is None:
+                continue
+            if _tree_may_have_preview(nt):
+                touched.append(mat)
+
+        for mat in touched:
             try:
                 removed = _clear_preview_nodes_in_material(mat)
             except Exception:
@@ -6674,8 +7047,8 @@ def _popular_pick_template_by_color(candidates: List[str], rgb: Tuple[float, flo
     for tmpl in candidates:
         for rows in _POPULAR_CACHE_BRANDS.values():
             for r in rows:
-                if (r.get("name") or "") == tmpl:
-                    prgb = r.get("rgb", None)
+                if r.name == tmpl:
+                    prgb = r.rgb
                     if prgb and _same(prgb, rgb):
                         return tmpl
 
@@ -7299,9 +7672,9 @@ class I3D_CL_OT_XMLImportSelected(bpy.types.Operator):
                 for r in rows:
                     popular_rows.append({
                         "brand": brand,
-                        "name": r.get("name", ""),
-                        "rgb": r.get("rgb", (1.0, 1.0, 1.0)),
-                        "colorScale": r.get("colorScale", ""),
+                        "name": r.name,
+                        "rgb": r.rgb or (1.0, 1.0, 1.0),
+                        "colorScale": r.colorScale,
                     })
         except Exception:
             popular_rows = []
@@ -7379,15 +7752,14 @@ class I3D_CL_OT_XMLImportSelected(bpy.types.Operator):
                 return cands2[0]
 
             return nm
-        giants_rows: List[Tuple[str, Dict[str, Any]]] = []
-        giants_by_name: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        giants_rows: List[Tuple[str, _BrandRow]] = []
+        giants_by_name: Dict[str, Tuple[str, _BrandRow]] = {}
         try:
             for brand, rows in _GIANTS_CACHE_BRANDS.items():
                 for r in rows:
                     giants_rows.append((brand, r))
-                    nm = (r.get("name") or "").strip()
-                    if nm:
-                        giants_by_name.setdefault(nm.lower(), (brand, r))
+                    if r.name_lc:
+                        giants_by_name.setdefault(r.name_lc, (brand, r))
         except Exception:
             giants_rows = []
             giants_by_name = {}
@@ -7402,12 +7774,12 @@ class I3D_CL_OT_XMLImportSelected(bpy.types.Operator):
                     return r
             return None
 
-        def _find_giants_by_name_color(name: str, trip: Tuple[float, float, float]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        def _find_giants_by_name_color(name: str, trip: Tuple[float, float, float]) -> Optional[Tuple[str, _BrandRow]]:
             nl = (name or "").lower()
             for brand, r in giants_rows:
-                if (r.get("name") or "").lower() != nl:
+                if r.name_lc != nl:
                     continue
-                rgb = r.get("rgb") or (1.0, 1.0, 1.0)
+                rgb = r.rgb or (1.0, 1.0, 1.0)
                 if _same_color(rgb, trip):
                     return (brand, r)
             return None
@@ -7425,9 +7797,9 @@ class I3D_CL_OT_XMLImportSelected(bpy.types.Operator):
                 if not hit:
                     continue
                 brand, r = hit
-                nm = (r.get("name") or "").strip() or tmpl
-                rgb = r.get("rgb") or (1.0, 1.0, 1.0)
-                cs = (r.get("colorScale") or "").strip() or _giants_srgb_text(rgb)
+                nm = r.name or tmpl
+                rgb = r.rgb or (1.0, 1.0, 1.0)
+                cs = r.colorScale or _giants_srgb_text(rgb)
                 key = f"GIANTS|{brand}|{nm}|{cs}"
                 _xml_add_selected(scene, key=key, name=nm, color=rgb, source="GIANTS", brand=brand, materialTemplate="")
                 imported += 1
@@ -7547,7 +7919,7 @@ class I3D_CL_OT_XMLImportSelected(bpy.types.Operator):
             gr = _find_giants_by_name_color(nm, trip)
             if gr:
                 brand, r = gr
-                cs = (r.get("colorScale") or "").strip() or _giants_srgb_text(r.get("rgb") or trip)
+                cs = r.colorScale or _giants_srgb_text(r.rgb or trip)
                 key = f"GIANTS|{brand}|{nm}|{cs}"
                 _xml_add_selected(scene, key=key, name=nm, color=trip, source="GIANTS", brand=brand, materialTemplate="")
                 imported += 1
@@ -7831,9 +8203,9 @@ def draw_color_library(layout, context):
             _draw_xml_mode_controls(box, scene, 'MY')
             return
 
-        idx = scene.i3d_cl_my_index
-        if 0 <= idx < len(scene.i3d_cl_my_colors):
-            item = scene.i3d_cl_my_colors[idx]
+        idx, coll = _GET_MY_SELECTION(scene)
+        if 0 <= idx < len(coll):
+            item = coll[idx]
             sel = box.box()
             sel.label(text="Selected")
 
@@ -7983,9 +8355,9 @@ def draw_color_library(layout, context):
             _draw_xml_mode_controls(box, scene, 'GIANTS')
             return
 
-        idx = scene.i3d_cl_giants_index
-        if 0 <= idx < len(scene.i3d_cl_giants_colors):
-            item = scene.i3d_cl_giants_colors[idx]
+        idx, coll = _GET_GIANTS_SELECTION(scene)
+        if 0 <= idx < len(coll):
+            item = coll[idx]
             sel = box.box()
             sel.label(text="Selected")
 
@@ -8129,9 +8501,9 @@ def draw_color_library(layout, context):
             _draw_xml_mode_controls(box, scene, 'POPULAR')
             return
 
-        idx = scene.i3d_cl_popular_index
-        if 0 <= idx < len(scene.i3d_cl_popular_colors):
-            item = scene.i3d_cl_popular_colors[idx]
+        idx, coll = _GET_POPULAR_SELECTION(scene)
+        if 0 <= idx < len(coll):
+            item = coll[idx]
             sel = box.box()
             sel.label(text="Selected")
 
@@ -8235,12 +8607,20 @@ def draw_color_library(layout, context):
 
 
 def _on_load_post(_dummy):
+    # "//"-relative decal paths resolve against the loaded .blend; the load also drops the warm-up timer.
+    _DECAL_ICON_IDS.clear()
+    _DECAL_ICON_WARM_QUEUE.clear()
     try:
         load_my_colors()
     except Exception:
         pass
 
 
+@persistent
+def _on_load_pre(_dummy):
+    _flush_pending_save()
+
+
 def _on_save_pre(_dummy):
     try:
         save_my_colors()
@@ -8334,6 +8714,7 @@ classes = (
     I3D_CL_OT_ApplyPopularToMaterialPermanent,
     I3D_CL_OT_ApplyPopularToGiantsColorScale,
     I3D_CL_OT_AddPopularToMyLibrary,
+    I3D_CL_OT_BatchAddToMyLibrary,
     I3D_CL_OT_PickDecalBaseImage,
     I3D_CL_OT_ShowDecalPreview,
     I3D_CL_OT_PermApplyDetailPrompt,
@@ -8539,9 +8920,12 @@ def register():
         bpy.app.handlers.load_post.append(_on_load_post)
     if _on_save_pre not in bpy.app.handlers.save_pre:
         bpy.app.handlers.save_pre.append(_on_save_pre)
+    if _on_load_pre not in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.append(_on_load_pre)
 
 
 def unregister():
+    _flush_pending_save()
     try:
         _cl_decal_previews_free()
     except Exception:
@@ -8550,6 +8934,8 @@ def unregister():
         bpy.app.handlers.load_post.remove(_on_load_post)
     if _on_save_pre in bpy.app.handlers.save_pre:
         bpy.app.handlers.save_pre.remove(_on_save_pre)
+    if _on_load_pre in bpy.app.handlers.load_pre:
+        bpy.app.handlers.load_pre.remove(_on_load_pre)
 
     # Scene properties
     for attr in (